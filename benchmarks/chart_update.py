@@ -0,0 +1,52 @@
+"""
+Cost of updating chart data: BarPlot.ys is set to new values every frame
+(like the debug info viewer does), with and without rendering the chart.
+
+usage: python benchmarks/chart_update.py [bars] [updates]
+"""
+
+import os
+import random
+import sys
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+import pygame
+from pyengine import AssetManager, Pos, Size, TextCache
+from pyengine.barplot import BarPlot
+
+W = 1280
+H = 720
+
+
+def main():
+    bars = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    updates = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    pygame.init()
+    sur = pygame.display.set_mode((W, H))
+    xs = [f"entity {i}" for i in range(bars)]
+    plot = BarPlot(Pos(), Size(W, H), [1.0] * bars, xs, "update time per entity ns")
+    data = [[random.random() for _ in range(bars)] for _ in range(updates)]
+
+    start = time.perf_counter()
+    for ys in data:
+        plot.ys = ys
+    update_ms = (time.perf_counter() - start) * 1000 / updates
+
+    start = time.perf_counter()
+    for ys in data:
+        plot.ys = ys
+        plot.render(sur)
+    render_ms = (time.perf_counter() - start) * 1000 / updates
+
+    print(f"ys update: {update_ms:.3f} ms")
+    print(f"ys update + render: {render_ms:.3f} ms")
+    print(
+        f"fonts loaded: {len(AssetManager().assets)}, "
+        f"text cache hits/misses: {TextCache().hits}/{TextCache().misses}"
+    )
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
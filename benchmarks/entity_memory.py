@@ -0,0 +1,54 @@
+"""
+Memory per entity for Entity subclasses with and without __slots__.
+Check out an older commit and run it again to compare.
+
+usage: python benchmarks/entity_memory.py [count]
+"""
+
+import sys
+import tracemalloc
+from pyengine import Entity, SlottedEntity, Vector2
+
+
+class Bare(Entity):
+    pass
+
+
+class DictSquare(Entity):
+    def __init__(self):
+        super().__init__()
+        self.dir = Vector2(1, 1)
+        self.speed = 50
+
+
+class SlottedSquare(SlottedEntity):
+    __slots__ = ("dir", "speed")
+
+    def __init__(self):
+        super().__init__()
+        self.dir = Vector2(1, 1)
+        self.speed = 50
+
+
+def bytes_per_entity(entity_type: type, count: int) -> float:
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    entities = [entity_type() for _ in range(count)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del entities
+    return (after - before) / count
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    for entity_type in (Bare, DictSquare, SlottedSquare):
+        per_entity = bytes_per_entity(entity_type, count)
+        print(
+            f"{entity_type.__name__}: {per_entity:.0f} bytes per entity, "
+            f"{per_entity * count / 2**20:.1f} MiB for {count}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""
+RenderManager render time for many sprites, batched with Surface.blits
+and drawn one render() call at a time.
+
+usage: python benchmarks/sprite_batch.py [count] [frames]
+"""
+
+import os
+import sys
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+import pygame
+from pyengine import RenderManager, Sprite, Vector2
+
+W = 1280
+H = 720
+
+
+def ms_per_frame(sur: pygame.Surface, frames: int) -> float:
+    start = time.perf_counter()
+    for _ in range(frames):
+        RenderManager().render(sur)
+    return (time.perf_counter() - start) * 1000 / frames
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    frames = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    pygame.init()
+    sur = pygame.display.set_mode((W, H))
+    image = pygame.Surface((8, 8)).convert()
+    image.fill((245, 154, 0))
+    sprites = [
+        Sprite(image, Vector2(i * 37 % (W - 8), i * 53 % (H - 8))) for i in range(count)
+    ]
+    for sprite in sprites:
+        RenderManager().register(sprite)
+
+    for batch_sprites in (False, True):
+        RenderManager().batch_sprites = batch_sprites
+        print(
+            f"batch_sprites={batch_sprites}: "
+            f"{ms_per_frame(sur, frames):.2f} ms per frame for {count} sprites"
+        )
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
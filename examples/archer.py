@@ -1,5 +1,7 @@
 from math import atan2, cos, pi, sin
 from random import randint
+import sys
+import time
 from typing import List, Tuple
 import pygame
 from pygame import BUTTON_LEFT, Color, Rect
@@ -132,6 +134,13 @@ class Target(CollideEntity):
         super().kill()
         Targets().unregister_target(self)
 
+    def render_bounds(self):
+        # the line is centered on pos, half of it is outside the rect
+        half = Vector2(abs(self.vec.x), abs(self.vec.y)) / 2 + Size(
+            Target.THICKNESS, Target.THICKNESS
+        )
+        return Rect(self.screen_pos() - half, half * 2)
+
     def render(self, sur):
         pygame.draw.line(
             sur,
@@ -358,14 +367,15 @@ class Player(CollideEntity, metaclass=Singelton):
         else:
             self.vel_y += G * 5 * dt
             self.transform.pos.y += self.vel_y
-        unnormalized = Vector2(pygame.mouse.get_pos()) - Vector2(
+        unnormalized = Vector2(InputManager().mouse_pos) - Vector2(
             self.transform.rect().center
         )
         if unnormalized.length_squared() == 0:
             self.bow_dir = Vector2(0, 1)
         else:
             self.bow_dir = (
-                Vector2(pygame.mouse.get_pos()) - Vector2(self.transform.rect().center)
+                Vector2(InputManager().mouse_pos)
+                - Vector2(self.transform.rect().center)
             ).normalize()
 
     def render_bow(self, sur: Surface):
@@ -393,7 +403,7 @@ class Player(CollideEntity, metaclass=Singelton):
         pygame.draw.rect(sur, Color("Red"), self.create_bow_rect(), 1)
         arc_midpoint = self.get_arc_midpoint()
         pygame.draw.circle(sur, Color("Red"), arc_midpoint, 3)
-        x = pygame.mouse.get_pos()[0]
+        x = InputManager().mouse_pos[0]
         pygame.draw.circle(
             sur,
             Color("Red"),
@@ -417,19 +427,33 @@ def start_game_scene():
 
 
 def main():
+    # --record path or --replay path, replays run headless
+    mode, path = sys.argv[1:3] if len(sys.argv) > 2 else (None, None)
+    if mode == "--record":
+        InputManager().record(path)
+    elif mode == "--replay":
+        InputManager().replay(path)
     start_game_scene()
 
     pygame.init()
     pygame.display.set_caption("Archer")
-    screen = pygame.display.set_mode((W, H))
+    if mode == "--replay":
+        screen = GameManager().init_headless((W, H))
+    else:
+        screen = pygame.display.set_mode((W, H))
     GameManager().debug = True
     UpdateManager().start_fixed_update_loop()
+    start = time.perf_counter()
     while not GameManager().should_exit:
         screen.fill(BG)
         GameManager().update()
         GameManager().render(screen)
-        pygame.display.flip()
+        GameManager().present()
     UpdateManager().stop_fixed_update_loop()
+    if mode == "--replay":
+        elapsed = time.perf_counter() - start
+        print(f"replayed {InputManager().frame_number} frames in {elapsed:.2f} s")
+    InputManager().stop()
 
 
 if __name__ == "__main__":
@@ -75,7 +75,7 @@ class ColorPalette(Entity):
                 self.palette.set_at((x, y), color)
 
     def on_mouse_release(self):
-        mouse_pos = Pos(pygame.mouse.get_pos())
+        mouse_pos = Pos(InputManager().mouse_pos)
         if self.saturation_bar_transfrom.rect().collidepoint(mouse_pos):
             self.s = (
                 1
@@ -83,6 +83,7 @@ class ColorPalette(Entity):
                 / self.saturation_bar_transfrom.size.h
             )
             self.redraw_palette()
+            self.mark_dirty()
 
         color = self.get_hovered_color()
         if color and self.on_pick:
@@ -92,7 +93,7 @@ class ColorPalette(Entity):
     def on_mouse_pressed(self):
         color = self.get_hovered_color()
         if not color and not self.saturation_bar_transfrom.rect().collidepoint(
-            pygame.mouse.get_pos()
+            InputManager().mouse_pos
         ):
             GameManager().destroy(self)
 
@@ -105,11 +106,13 @@ class ColorPalette(Entity):
 
     def update(self, dt):
         super().update(dt)
-        mouse_pos = pygame.mouse.get_pos()
+        mouse_pos = InputManager().mouse_pos
+        hovered_pos = None
         if self.palette_transform.rect().collidepoint(mouse_pos):
-            self.hovered_pos = Pos(mouse_pos)
-        else:
-            self.hovered_pos = None
+            hovered_pos = Pos(mouse_pos)
+        if hovered_pos != self.hovered_pos:
+            self.mark_dirty()
+        self.hovered_pos = hovered_pos
 
     def render_debug(self, sur):
         super().render_debug(sur)
@@ -169,14 +172,17 @@ def main():
         ColorPalette(Pos(0, 0), Size(W, H), lambda c: print("Color" + c.__str__()))
     )
     GameManager().debug = True
+    # with debug off, only the changed regions are repainted
+    RenderManager().dirty_rects_mode = True
+    RenderManager().background = BG
 
     while not GameManager().should_exit:
 
         GameManager().update()
         GameManager().render(display)
 
-        # flip() the display to put your work on screen
-        pygame.display.flip()
+        # put the changed regions on screen
+        GameManager().present()
 
 
 if __name__ == "__main__":
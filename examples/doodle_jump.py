@@ -1,4 +1,6 @@
 from random import random
+import sys
+import time
 import pygame
 from pygame import Color, Vector2, Surface, Rect
 from dataclasses import dataclass
@@ -11,18 +13,26 @@ G = 700
 FPS = 70
 
 
-class Camera(Entity):
+class CameraController(Entity):
     def __init__(self, target: Entity):
         super().__init__()
         self.target = target
-        self.transform.size = Size(W, H)
-        self.transform.center = target.transform.center
-        self._offset = Vector2()
+        self.camera = Camera(Pos(W / 2, H / 2))
+        self._start_center_y = target.transform.center.y
+
+    def start(self):
+        super().start()
+        RenderManager().camera = self.camera
+
+    def kill(self):
+        super().kill()
+        RenderManager().camera = None
 
     def update(self, dt):
         if H / 2 < self.target.transform.center.y < H:
-            self._offset = self.target.transform.center - self.transform.center
-            self._offset.x = 0
+            self.camera.pos.y = (
+                H / 2 + self.target.transform.center.y - self._start_center_y
+            )
         return super().update(dt)
 
 
@@ -38,24 +48,16 @@ class Platform(CollideEntity):
         self.transform.pos = pos
         self.transform.size = Size(width, Platform.PLATFORM_HEIGHT)
         self.speed = speed
+        self.add_body(velocity=Vector2(0, speed), gravity_scale=0)
         self.bumpness = -400
         self.render_data = Platform.RenderData(Color(192, 86, 0, 255))
-        self.camera: Camera | None = None
-
-    def fixed_update(self, fixed_dt):
-        self.transform.pos.y += self.speed * fixed_dt
 
     def update(self, dt):
         if self.transform.pos.y > H + 300:
             GameManager().destroy(self)
 
     def render(self, sur: Surface):
-        render_pos = self.transform.pos
-        if self.camera:
-            render_pos = self.transform.pos - self.camera._offset
-        pygame.draw.rect(
-            sur, self.render_data.color, Rect(render_pos, self.transform.size)
-        )
+        pygame.draw.rect(sur, self.render_data.color, self.screen_rect())
 
 
 class DangerousePlatform(Platform):
@@ -79,17 +81,13 @@ class SlidingPlatform(Platform):
     def __init__(self, pos: Vector2, width, speed):
         super().__init__(pos, width, speed)
         self.render_data.color = Color("Blue")
-        self.dir = 100
-
-    def fixed_update(self, fixed_dt):
-        self.transform.pos.x += self.dir * fixed_dt
-        return super().fixed_update(fixed_dt)
+        self.body.velocity.x = 100
 
     def update(self, dt):
         if self.transform.rect().right > W:
-            self.dir = -100
+            self.body.velocity.x = -100
         if self.transform.pos.x < 0:
-            self.dir = 100
+            self.body.velocity.x = 100
         return super().update(dt)
 
 
@@ -117,6 +115,7 @@ class Player(CollideEntity):
             super().__init__()
             self.player = player
             self.should_render = False
+            self.screen_space = True
             self._distance_from_top = 40
             self._edge_size = 30
 
@@ -145,11 +144,11 @@ class Player(CollideEntity):
     @staticmethod
     def _check_collision_platform(player: CollideEntity, platform: Platform):
         if (
-            player.velocity.y > 20
+            player.body.velocity.y > 20
             and player.transform.rect().colliderect(platform.transform.rect())
             and player.transform.rect().bottom <= platform.transform.rect().bottom
         ):
-            player.velocity.y = platform.bumpness
+            player.body.velocity.y = platform.bumpness
 
     @staticmethod
     def _check_collision_dangerouse_platform(
@@ -157,16 +156,16 @@ class Player(CollideEntity):
     ):
         if player.transform.rect().colliderect(platform.transform.rect()):
             if (
-                player.velocity.y > 20
+                player.body.velocity.y > 20
                 and player.transform.rect().bottom <= platform.transform.rect().bottom
             ):
                 # collision from bellow
-                player.velocity.y = platform.bumpness
+                player.body.velocity.y = platform.bumpness
             elif player.transform.rect().top >= platform.transform.rect().top:
                 print("hit")
                 platform.strength -= 1
                 platform.strength = max(platform.strength, 0)
-                player.velocity.y = -platform.bumpness
+                player.body.velocity.y = -platform.bumpness
 
     def __init__(self, pos: Pos, size: Size):
         super().__init__()
@@ -175,9 +174,7 @@ class Player(CollideEntity):
         self.render_data = Player.RenderData(
             Color(0, 204, 251, 255), Color(31, 12, 0, 255)
         )
-        self.velocity = Vector2(0, 0)
-        self.acceleration = Vector2(0, G)
-        self.camera: Camera | None = None
+        self.add_body(acceleration=Vector2(0, G), gravity_scale=0)
         self.speed = 200
 
     def start(self):
@@ -196,10 +193,10 @@ class Player(CollideEntity):
         GameManager().instatiate(Player.UiArrow(self))
 
     def _set_velocity_x(self, new_velocity):
-        self.velocity.x = new_velocity
+        self.body.velocity.x = new_velocity
 
     def _set_velocity_y(self, new_velocity):
-        self.velocity.y = new_velocity
+        self.body.velocity.y = new_velocity
 
     def _update_render_data(self, dt):
         t = pygame.time.get_ticks()
@@ -227,14 +224,8 @@ class Player(CollideEntity):
             GameManager().clear_scene()
             GameManager().instatiate(GameOverScreen())
 
-    def fixed_update(self, fixed_dt):
-        self.transform.pos += self.velocity * fixed_dt
-        self.velocity += self.acceleration * fixed_dt
-
     def render(self, sur: Surface):
-        render_pos = self.transform.pos
-        if self.camera:
-            render_pos = self.transform.pos - self.camera._offset
+        render_pos = self.screen_pos()
 
         # render body
         pygame.draw.rect(
@@ -286,7 +277,7 @@ class Collectable(CollideEntity):
         pygame.draw.circle(
             sur,
             self.color,
-            self.transform.center - self.platform.camera._offset,
+            self.screen_pos(),
             self.radius,
         )
 
@@ -323,7 +314,6 @@ class PlatformSpawner(Entity):
         self.speed = 90
         self.max_width = W / 2
         self.min_width = W / 7
-        self.camera: Camera | None = None
         self.danger_platform_chance = 0.2
         self.sliding_platform_chance = 0.2
         self.boost_platform_chance = 0.1
@@ -380,7 +370,6 @@ class PlatformSpawner(Entity):
             new_platform = BoostPlatform(
                 self.transform.pos + pos_offset, random_width, platform_speed
             )
-        new_platform.camera = self.camera
         GameManager().instatiate(new_platform)
         r = random()
         if r < self.speed_boost_chance:
@@ -397,7 +386,7 @@ class MenuButton(UiButton):
 
     def start(self):
         super().start()
-        self.render_data.font = pygame.font.Font(size=int(0.4 * self.transform.size.w))
+        self.render_data.font = CachedFont(size=int(0.4 * self.transform.size.w))
 
 
 class GameOverScreen(Entity):
@@ -434,6 +423,7 @@ class GameOverScreen(Entity):
 
     def __init__(self):
         super().__init__()
+        self.screen_space = True
         self.z_index = -100
         self.font = pygame.font.Font(size=int(W / 8))
         title_surf = self.font.render("Game Over", True, Color("White"))
@@ -469,29 +459,40 @@ def start_game_scene():
     GameManager().clear_scene()
     player = Player(Pos(W / 2, H / 2), Size(30, 40))
     platformSpawner = PlatformSpawner(Pos(0, 0))
-    camera = Camera(player)
-
-    player.camera = camera
-    platformSpawner.camera = camera
+    camera_controller = CameraController(player)
 
-    GameManager().instatiate(camera, player, platformSpawner)
+    GameManager().instatiate(camera_controller, player, platformSpawner)
 
 
 def main():
+    # --record path or --replay path, replays run headless
+    mode, path = sys.argv[1:3] if len(sys.argv) > 2 else (None, None)
+    if mode == "--record":
+        InputManager().record(path)
+    elif mode == "--replay":
+        InputManager().replay(path)
     start_game_scene()
     pygame.init()
-    screen = pygame.display.set_mode((W, H))
+    if mode == "--replay":
+        screen = GameManager().init_headless((W, H))
+    else:
+        screen = pygame.display.set_mode((W, H))
 
     GameManager().fps = 100
     UpdateManager.FIXED_DT = 0.005
     UpdateManager().start_fixed_update_loop()
     GameManager().debug = True
+    start = time.perf_counter()
     while not GameManager().should_exit:
         screen.fill(BG)
         GameManager().update()
         GameManager().render(screen)
-        pygame.display.flip()
+        GameManager().present()
     UpdateManager().stop_fixed_update_loop()
+    if mode == "--replay":
+        elapsed = time.perf_counter() - start
+        print(f"replayed {InputManager().frame_number} frames in {elapsed:.2f} s")
+    InputManager().stop()
 
 
 if __name__ == "__main__":
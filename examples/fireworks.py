@@ -0,0 +1,48 @@
+from random import randint, random
+import pygame
+from pygame import Color
+from pyengine import *
+
+W = 640
+H = 512
+BG = Color("Black")
+
+
+class Fireworks(ParticleSystem):
+    INTERVAL = 0.3
+
+    def __init__(self):
+        super().__init__(radius=1.5, gravity=Vector2(0, 120), capacity=50_000)
+        self.timer = 0
+
+    def update(self, dt):
+        self.timer += dt
+        if self.timer > Fireworks.INTERVAL:
+            self.timer = 0
+            self.transform.pos = Pos(random() * W, random() * H / 2)
+            self.emit(
+                2000,
+                speed=(20, 200),
+                life=(1, 2.5),
+                color=Color(randint(100, 255), randint(100, 255), randint(100, 255)),
+            )
+        super().update(dt)
+
+
+def main():
+    pygame.init()
+    pygame.display.set_caption("Fireworks")
+    screen = pygame.display.set_mode((W, H))
+    GameManager().instatiate(Fireworks())
+    GameManager().debug = True
+
+    while not GameManager().should_exit:
+        screen.fill(BG)
+        GameManager().update()
+        GameManager().render(screen)
+        pygame.display.flip()
+
+
+if __name__ == "__main__":
+    main()
+    pygame.quit()
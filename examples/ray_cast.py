@@ -136,10 +136,60 @@ class Ray(Entity):
         self.updating = False
 
 
+class MinimapGrid(Entity):
+    """
+    The grid and the cells never change, render them once
+    """
+
+    def __init__(self, minimap: "Minimap"):
+        super().__init__()
+        self.minimap = minimap
+        self.transform.pos = minimap.transform.pos
+        self.transform.size = minimap.transform.size
+        self.z_index = minimap.z_index - 1
+        self.static = True
+
+    def render(self, sur: Surface):
+        minimap = self.minimap
+        rect = self.screen_rect()
+        pos = Pos(rect.topleft)
+        # draw grid
+        cell_size = Size(rect.w / minimap.col_count, rect.h / minimap.row_count)
+        line_width = max(1, round(3 * RenderManager().view_scale))
+        for x in range(minimap.col_count + 1):
+            pygame.draw.line(
+                sur,
+                minimap.grid_color,
+                pos + Pos(x * cell_size.x, 0),
+                pos + Pos(x * cell_size.x, rect.h),
+                width=line_width,
+            )
+        for y in range(minimap.row_count + 1):
+            pygame.draw.line(
+                sur,
+                minimap.grid_color,
+                pos + Pos(0, y * cell_size.y),
+                pos + Pos(rect.w, y * cell_size.y),
+                width=line_width,
+            )
+
+        # draw cells
+        for y, row in enumerate(CELLS):
+            for x, color in enumerate(row):
+                if color != 0:
+                    pygame.draw.rect(
+                        sur,
+                        minimap.grid_color,
+                        pygame.Rect(
+                            Pos(x * cell_size.w, y * cell_size.h) + pos, cell_size
+                        ),
+                    )
+
+
 class Minimap(Entity):
     def __init__(self, pos: Pos, size: Size, player: Player, rays: list[Ray] = []):
         super().__init__()
-        self.z_index = 100
+        self.z_index = 101
         self.transform.pos = pos
         self.transform.size = size
         self.player = player
@@ -149,6 +199,7 @@ class Minimap(Entity):
         self.grid_color = Color(90, 90, 90)
         self.player_radius_render = self.transform.size.magnitude() / 100
         self.rays = rays
+        self.grid = GameManager().instatiate(MinimapGrid(self))
 
     def cell_size(self) -> Size:
         return Size(
@@ -164,13 +215,8 @@ class Minimap(Entity):
         )
 
     def screen_coords_to_minimap(self, coords: Vector2):
-        return (
-            Vector2(
-                coords.x * self.transform.size.w / W,
-                coords.y * self.transform.size.h / H,
-            )
-            + self.transform.pos
-        )
+        rect = self.screen_rect()
+        return Vector2(coords.x * rect.w / W, coords.y * rect.h / H) + rect.topleft
 
     def minimap_coord_to_screen(self, coords: Vector2):
         return (
@@ -184,15 +230,18 @@ class Minimap(Entity):
     def render_mini_player(self, sur: Surface):
         player_mini_pos = self.screen_coords_to_minimap(self.player.transform.center)
 
+        view_scale = RenderManager().view_scale
         pygame.draw.circle(
             sur,
             self.player.color,
             player_mini_pos,
-            self.player_radius_render,
+            self.player_radius_render * view_scale,
         )
 
         # draw fov
-        size_factor = self.transform.size.magnitude() / Vector2(W, H).magnitude()
+        size_factor = (
+            self.transform.size.magnitude() / Vector2(W, H).magnitude() * view_scale
+        )
         r1_length = self.player.half_range_length * size_factor
         half_fov_v = self.player.dir.rotate_rad(pi * 0.5) * r1_length
         mini_look_distance = self.player.look_distance * size_factor
@@ -223,41 +272,14 @@ class Minimap(Entity):
             pygame.draw.line(sur, ray.color, ray_mini_origin, ray_mini_head_pos)
 
     def render(self, sur: Surface):
-        # draw grid
-        cell_size = self.cell_size()
-        for x in range(self.col_count + 1):
-            pygame.draw.line(
-                sur,
-                self.grid_color,
-                self.transform.pos + Pos(x * cell_size.x, 0),
-                self.transform.pos + Pos(x * cell_size.x, self.transform.size.h),
-                width=3,
-            )
-        for y in range(self.row_count + 1):
-            pygame.draw.line(
-                sur,
-                self.grid_color,
-                self.transform.pos + Pos(0, y * cell_size.y),
-                self.transform.pos + Pos(self.transform.size.w, y * cell_size.y),
-                width=3,
-            )
-
-        # draw cells
-        for y, row in enumerate(CELLS):
-            for x, color in enumerate(row):
-                if color != 0:
-                    pygame.draw.rect(
-                        sur,
-                        self.grid_color,
-                        pygame.Rect(
-                            Pos(x * cell_size.w, y * cell_size.h) + self.transform.pos,
-                            cell_size,
-                        ),
-                    )
         # draw player dot
         self.render_mini_player(sur)
         self.render_mini_rays(sur)
 
+    def kill(self):
+        super().kill()
+        GameManager().destroy(self.grid)
+
 
 class World(Entity):
     def __init__(self, pos: Pos, size: Size, samples, player: Player):
@@ -286,6 +308,10 @@ class World(Entity):
             ray.transform.center = self.player.transform.center
 
     def render(self, sur: Surface):
+        rect = self.screen_rect()
+        # the strips are laid out in the world's size, drawn in its screen rect
+        scale = rect.w / self.transform.size.w
+        strip_width = ceil(self.strip_width * scale)
         for i in range(self.samples):
             ray = self.rays[i]
             if ray.updating:
@@ -315,10 +341,10 @@ class World(Entity):
                     sur,
                     color,
                     pygame.Rect(
-                        self.transform.size.w / self.samples * i,
-                        (self.transform.size.h - h) / 2,
-                        self.strip_width,
-                        h,
+                        rect.x + rect.w / self.samples * i,
+                        rect.y + (rect.h - h * scale) / 2,
+                        strip_width,
+                        h * scale,
                     ),
                 )
 
@@ -331,6 +357,10 @@ def main():
     GameManager().instatiate(minimap, player, world)
 
     GameManager().fps = 100
+    # the wall strips are fill rate bound, render them at half resolution
+    GameManager().render_scale = 0.5
+    # the render target is cleared with it, not with the screen's fill
+    RenderManager().background = BG
 
     screen = pygame.display.set_mode((W, H))
 
@@ -340,7 +370,7 @@ def main():
         screen.fill(BG)
         GameManager().update()
         GameManager().render(screen)
-        pygame.display.flip()
+        GameManager().present()
     UpdateManager().stop_fixed_update_loop()
 
 
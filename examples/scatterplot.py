@@ -30,7 +30,9 @@ class ScatterPlot(Entity):
         super().__init__()
         self.transform.pos = pos
         self.transform.size = size
-        self.values_font = pygame.font.Font(size=ScatterPlot.VALUE_FONT_SIZE)
+        self.values_font = AssetManager().font(None, ScatterPlot.VALUE_FONT_SIZE)
+        self.details_title_font: CachedFont = None
+        self.details_value_font: CachedFont = None
 
         self._ys = []
         self.ys = ys
@@ -39,8 +41,9 @@ class ScatterPlot(Entity):
         self.recalculate_params_x()
         self.axis_color = ScatterPlot.AXIS_COLOR
 
-        title_font = pygame.font.Font(size=int(self.transform.size.h / 7))
+        title_font = AssetManager().font(None, int(self.transform.size.h / 7))
         self.title_sur = title_font.render(title, True, ScatterPlot.LABEL_COLOR)
+        AssetManager().release(title_font)
 
     def recalculate_params_x(self):
         self.max_value_x = max(self._xs) if len(self._xs) > 0 else 0
@@ -79,8 +82,12 @@ class ScatterPlot(Entity):
         self.details_h = self.transform.size.h / 2
         details_title_h = int(self.details_h / 3)
         details_value_h = int(self.details_h - details_title_h)
-        self.details_title_font = pygame.font.Font(size=details_title_h)
-        self.details_value_font = pygame.font.Font(size=details_value_h)
+        self.details_title_font = AssetManager().font(
+            None, details_title_h, replacing=self.details_title_font
+        )
+        self.details_value_font = AssetManager().font(
+            None, details_value_h, replacing=self.details_value_font
+        )
 
     def push_xy(self, xy: Tuple[float, float]):
         x, y = xy
@@ -174,6 +181,12 @@ class ScatterPlot(Entity):
             self.transform.rect().bottom - (y - self.min_value_y) * self.scale_factor_y
         )
 
+    def kill(self):
+        super().kill()
+        AssetManager().release(self.values_font)
+        AssetManager().release(self.details_title_font)
+        AssetManager().release(self.details_value_font)
+
     def render(self, sur):
         super().render(sur)
         self.draw_axis(sur)
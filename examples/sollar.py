@@ -5,23 +5,10 @@ from typing import List
 
 W = 1280
 H = 720
-pan_center = Pos(W / 2, H / 2)
 BG = Color("Black")
 G = 0.1
-scale = 1.0
 MAX_MASS = 100000000
 
-# CENTER + (pos-CENTER)*scale = res
-# pos = res-CENTER/scale + CENTER
-
-
-def world_to_screen(pos: Pos):
-    return pan_center + (pos - Pos(W / 2, H / 2)) * scale
-
-
-def screen_to_world(pos: Pos):
-    return (pos - pan_center) / scale + Pos(W / 2, H / 2)
-
 
 class Slider(Entity):
     HEIGHT = 10
@@ -32,6 +19,7 @@ class Slider(Entity):
         self, width, initial_value, on_change, min=0, max=1, color=COLOR, name=""
     ):
         super().__init__()
+        self.screen_space = True
         self.transform.size = Size(width, Slider.HEIGHT)
         self.value = initial_value
         self.on_change = on_change
@@ -50,8 +38,7 @@ class Slider(Entity):
         self.value = value
 
     def on_pressed(self):
-        mouse_pos = pygame.mouse.get_pos()
-        if self.transform.rect().collidepoint(mouse_pos):
+        if self.transform.rect().collidepoint(InputManager().mouse_pos):
             self.dragging = True
 
     def on_release(self):
@@ -70,9 +57,8 @@ class Slider(Entity):
     def update(self, dt):
         super().update(dt)
         if self.dragging:
-            mouse_pos = pygame.mouse.get_pos()
             self.value = pygame.math.clamp(
-                self.get_value_from_x(mouse_pos[0]), self.min, self.max
+                self.get_value_from_x(InputManager().mouse_pos[0]), self.min, self.max
             )
             self.on_change(self.value)
 
@@ -133,8 +119,8 @@ class Planet(Entity):
 
     def on_press(self):
         if (
-            world_to_screen(self.transform.pos).distance_to(pygame.mouse.get_pos())
-            < self.radius * scale
+            self.screen_pos().distance_to(InputManager().mouse_pos)
+            < self.radius * RenderManager().camera.zoom
         ):
             self.dragging = True
 
@@ -144,7 +130,9 @@ class Planet(Entity):
     def update(self, dt):
         super().update(dt)
         if self.dragging:
-            self.transform.pos = screen_to_world(Pos(pygame.mouse.get_pos()))
+            self.transform.pos = RenderManager().camera.screen_to_world(
+                InputManager().mouse_pos
+            )
             if self.on_drag:
                 self.on_drag()
 
@@ -172,8 +160,8 @@ class Planet(Entity):
         pygame.draw.circle(
             sur,
             self.color,
-            world_to_screen(self.transform.pos),
-            self.radius * scale,
+            self.screen_pos(),
+            self.radius * RenderManager().camera.zoom,
         )
 
     def copy(self):
@@ -217,7 +205,7 @@ class SollarSystem(Entity):
         ):
             return
         self.dragging = True
-        self.dragging_start_pos = Pos(pygame.mouse.get_pos())
+        self.dragging_start_pos = Pos(InputManager().mouse_pos)
 
     def on_release_drag(self):
         self.dragging = False
@@ -228,8 +216,8 @@ class SollarSystem(Entity):
         GameManager().destroy(*self.planets, *self.sliders)
 
     def on_scroll(self, _scroll):
-        global scale
-        scale = max(scale + _scroll.y * 0.1, 0.1)
+        camera = RenderManager().camera
+        camera.zoom = max(camera.zoom + _scroll.y * 0.1, 0.1)
 
     def on_space(self):
         self.running = not self.running
@@ -321,14 +309,14 @@ class SollarSystem(Entity):
         self.simulating = False
 
     def update(self, dt):
-        global pan_center
         for i, planet in enumerate(self.planets):
             self.sliders[i * 3 + 1].set_value(planet.velocity.x)
             self.sliders[i * 3 + 2].set_value(planet.velocity.y)
         if self.dragging:
-            mouse_pos = Pos(pygame.mouse.get_pos())  # screen-space
+            mouse_pos = Pos(InputManager().mouse_pos)  # screen-space
             delta = mouse_pos - self.dragging_start_pos
-            pan_center += delta
+            camera = RenderManager().camera
+            camera.pos -= delta / camera.zoom
             self.dragging_start_pos = (
                 mouse_pos  # Update to last mouse pos, not pan center
             )
@@ -344,6 +332,7 @@ class SollarSystem(Entity):
 
     def get_orbits_sur(self, size: Size):
         sur = Surface(size)
+        world_to_screen = RenderManager().camera.world_to_screen
         for orbit, planet in zip(self.orbits, self.planets):
             if len(orbit) == 0:
                 continue
@@ -371,6 +360,7 @@ class SollarSystemManager(Entity):
 
     def __init__(self):
         super().__init__()
+        self.screen_space = True
         self.sollar_system = None
         InputManager().register_key_up(K_r, self, self.create_sollar_system)
         self.key_map_sur = self.create_key_map()
@@ -409,13 +399,11 @@ class SollarSystemManager(Entity):
         self.create_sollar_system()
 
     def create_sollar_system(self):
-        global pan_center
-        pan_center.x = W / 2
-        pan_center.y = H / 2
+        RenderManager().camera.pos = Pos(W / 2, H / 2)
         if self.sollar_system:
             GameManager().destroy(self.sollar_system)
         sun = GameManager().instatiate(
-            Planet(pan_center.copy(), Vector2(0, 0), MAX_MASS, 220, Color("Yellow"))
+            Planet(Pos(W / 2, H / 2), Vector2(0, 0), MAX_MASS, 220, Color("Yellow"))
         )
 
         earth = GameManager().instatiate(
@@ -443,6 +431,7 @@ def main():
     pygame.init()
     pygame.display.set_caption("pe")
     screen = pygame.display.set_mode((W, H))
+    RenderManager().camera = Camera(Pos(W / 2, H / 2))
 
     UpdateManager().FIXED_DT = 0.1
     GameManager().instatiate(SollarSystemManager())
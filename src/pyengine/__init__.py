@@ -1,16 +1,37 @@
 from .core import (
     GameManager,
     Entity,
+    SlottedEntity,
+    Sprite,
+    RenderCommands,
+    DrawOp,
     Transform,
+    PooledTransform,
+    TransformPool,
+    Body,
+    BodyManager,
     Animation,
     UiButton,
     InputManager,
+    InputMode,
+    InputRecording,
     UpdateManager,
     RenderManager,
+    Camera,
+    ScaleMode,
+    StaticLayer,
+    TextCache,
+    CachedFont,
+    FrameRecorder,
+    RecordFormat,
+    RecordPolicy,
+    AssetManager,
     CollideEntity,
     ColliderManager,
     CollisionData,
     CollisionFunction,
+    FrameBudgetManager,
+    DegradationHook,
     EmptyEntity,
     EntityState,
     Singelton,
@@ -26,5 +47,6 @@ from .core import (
     Vector2Left,
     Surface,
 )
+from .particles import ParticleSystem
 
 __version__ = "0.0.2"
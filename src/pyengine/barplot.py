@@ -26,16 +26,23 @@ class BarPlot(Entity):
         super().__init__()
         self.transform.pos = pos
         self.transform.size = size
+        self.details_title_font: CachedFont = None
+        self.details_value_font: CachedFont = None
         self._ys = []
         self.ys = ys
         self.xs = xs
         self.recalculate_params()
         self.axis_color = BarPlot.AXIS_COLOR
+        self._axis_key = None
+        self._axis_sur: Surface = None
+        self._axis_margin = 0
+        self._view_sur: Surface = None
 
         self.hovered_bar_idx = None
 
-        title_font = pygame.font.Font(size=int(self.transform.size.h / 7))
+        title_font = AssetManager().font(None, int(self.transform.size.h / 7))
         self.title_sur = title_font.render(title, True, BarPlot.LABEL_COLOR)
+        AssetManager().release(title_font)
 
     def recalculate_params(self):
         self.max_value = max(self._ys) if len(self._ys) > 0 else 0
@@ -64,8 +71,13 @@ class BarPlot(Entity):
         self.details_h = self.transform.size.h / 2
         details_title_h = int(self.details_h / 3)
         details_value_h = int(self.details_h - details_title_h)
-        self.details_title_font = pygame.font.Font(size=details_title_h)
-        self.details_value_font = pygame.font.Font(size=details_value_h)
+        # called whenever ys changes, the fonts are shared by size
+        self.details_title_font = AssetManager().font(
+            None, details_title_h, replacing=self.details_title_font
+        )
+        self.details_value_font = AssetManager().font(
+            None, details_value_h, replacing=self.details_value_font
+        )
 
     @property
     def ys(self):
@@ -76,6 +88,7 @@ class BarPlot(Entity):
         if self.ys != ys:
             self._ys = ys
             self.recalculate_params()
+            self.mark_dirty()
 
     @ys.getter
     def ys(self):
@@ -109,70 +122,112 @@ class BarPlot(Entity):
                 return int(res)
         return None
 
-    def draw_axis(self, sur: Surface):
+    def draw_axis(self, sur: Surface, origin: Pos = (0, 0)):
+        # the axis only changes with the plot's rect and scale,
+        # render it once into a surface and blit that
+        rect = self.transform.rect()
+        key = (rect, self.zero, self.scale_factor, tuple(self.axis_color))
+        if self._axis_key != key:
+            self._axis_key = key
+            self._axis_sur = self.render_axis(rect)
+        # tick labels stick out half a line above the top tick
+        sur.blit(self._axis_sur, Pos(rect.left, rect.top - self._axis_margin) - origin)
+
+    def render_axis(self, rect: Rect) -> Surface:
+        self._axis_margin = GameManager().font.get_height()
+        axis_sur = Surface(
+            Size(rect.w, rect.h + self._axis_margin * 2), pygame.SRCALPHA
+        )
+        origin = Pos(rect.left, rect.top - self._axis_margin)
         pygame.draw.line(
-            sur,
+            axis_sur,
             self.axis_color,
-            Pos(self.transform.pos.x, self.zero),
-            Pos(
-                self.transform.rect().right,
-                self.zero,
-            ),
+            Pos(rect.left, self.zero) - origin,
+            Pos(rect.right, self.zero) - origin,
             2,
         )
 
         for tic_index in range(BarPlot.Y_TICS_COUNT):
-            tic_y = (
-                self.transform.pos.y
-                + tic_index * self.transform.size.h / BarPlot.Y_TICS_COUNT
-            )
+            tic_y = rect.top + tic_index * self.transform.size.h / BarPlot.Y_TICS_COUNT
 
             tic_label = f"{(self.zero - tic_y) / self.scale_factor:.2f}"
             pygame.draw.line(
-                sur,
+                axis_sur,
                 self.axis_color,
-                Pos(self.transform.pos.x, tic_y),
-                Pos(
-                    self.transform.rect().right,
-                    tic_y,
-                ),
+                Pos(rect.left, tic_y) - origin,
+                Pos(rect.right, tic_y) - origin,
             )
             tic_label_sur = GameManager().font.render(tic_label, False, self.axis_color)
-            sur.blit(
+            axis_sur.blit(
                 tic_label_sur,
-                Pos(self.transform.pos.x, tic_y - tic_label_sur.get_height() / 2),
+                Pos(rect.left, tic_y - tic_label_sur.get_height() / 2) - origin,
             )
+        return axis_sur
 
     def update(self, dt):
         super().update(dt)
         self.zero = self.transform.rect().bottom
         if self.min_value < 0:
             self.zero += self.min_value * self.scale_factor
-        mouse_pos = Pos(pygame.mouse.get_pos())
-        self.hovered_bar_idx = self.bar_idx_from_pos(mouse_pos)
+        hovered_bar_idx = self.bar_idx_from_pos(InputManager().render_mouse_pos)
+        # the details follow the mouse while a bar is hovered
+        if hovered_bar_idx != None or self.hovered_bar_idx != None:
+            self.mark_dirty()
+        self.hovered_bar_idx = hovered_bar_idx
 
-    def draw_details(self, sur: Surface, x: str, y: float):
-        origin = Pos(pygame.mouse.get_pos())
+    def draw_details(self, sur: Surface, x: str, y: float, origin: Pos = (0, 0)):
+        pos = Pos(InputManager().render_mouse_pos)
         title_sur = self.details_title_font.render(x, True, BarPlot.LABEL_COLOR)
         value_sur = self.details_value_font.render(
             f"{y:.4f}".rstrip("0").rstrip("."), True, BarPlot.LABEL_COLOR
         )
         details_w = max(title_sur.get_width(), value_sur.get_width())
-        origin.x -= details_w / 2
-        origin.x = pygame.math.clamp(
-            origin.x, self.transform.pos.x, self.transform.rect().right - details_w
+        pos.x -= details_w / 2
+        pos.x = pygame.math.clamp(
+            pos.x, self.transform.pos.x, self.transform.rect().right - details_w
         )
-        origin.y = pygame.math.clamp(
-            origin.y - self.details_h,
+        pos.y = pygame.math.clamp(
+            pos.y - self.details_h,
             self.transform.pos.y,
             self.transform.rect().bottom - self.details_h,
         )
-        sur.blit(title_sur, origin)
-        sur.blit(value_sur, origin + Size(0, title_sur.get_height()))
+        pos -= origin
+        sur.blit(title_sur, pos)
+        sur.blit(value_sur, pos + Size(0, title_sur.get_height()))
+
+    def kill(self):
+        super().kill()
+        AssetManager().release(self.details_title_font)
+        AssetManager().release(self.details_value_font)
 
     def render(self, sur):
         super().render(sur)
-        self.draw_axis(sur)
+        rect = self.transform.rect()
+        screen_rect = self.screen_rect()
+        if screen_rect == rect:
+            self.draw_plot(sur)
+            return
+        if rect.w <= 0 or rect.h <= 0:
+            return
+        # through a camera or render_scale the plot is drawn at its own size
+        # and scaled into its screen rect, the axis labels stick out by a line
+        margin = GameManager().font.get_height()
+        size = (rect.w, rect.h + margin * 2)
+        if self._view_sur is None or self._view_sur.get_size() != size:
+            self._view_sur = Surface(size, pygame.SRCALPHA)
+        self._view_sur.fill((0, 0, 0, 0))
+        self.draw_plot(self._view_sur, Pos(rect.left, rect.top - margin))
+        scale = screen_rect.h / rect.h
+        view_sur = pygame.transform.smoothscale(
+            self._view_sur, (screen_rect.w, round(size[1] * scale))
+        )
+        sur.blit(view_sur, (screen_rect.left, round(screen_rect.top - margin * scale)))
+
+    def draw_plot(self, sur: Surface, origin: Pos = (0, 0)):
+        """
+        The plot in transform coordinates, less origin
+        """
+        self.draw_axis(sur, origin)
         left = self.transform.pos.x
         for x, y in zip(self._xs, self._ys):
             left += BarPlot.BAR_X_PAD
@@ -182,7 +237,7 @@ class BarPlot(Entity):
             if y < 0:
                 top = self.zero
 
-            bar_rect = Rect(Pos(left, top), Size(self.bar_width, h))
+            bar_rect = Rect(Pos(left, top) - origin, Size(self.bar_width, h))
             bar_label_sur = GameManager().font.render(x, True, BarPlot.LABEL_COLOR)
             bar_label_rect = bar_label_sur.get_rect()
             if bar_label_rect.w > self.bar_width and self.bar_width < h:
@@ -205,9 +260,12 @@ class BarPlot(Entity):
             left += self.bar_width
         if self.hovered_bar_idx != None:
             self.draw_details(
-                sur, self._xs[self.hovered_bar_idx], self._ys[self.hovered_bar_idx]
+                sur,
+                self._xs[self.hovered_bar_idx],
+                self._ys[self.hovered_bar_idx],
+                origin,
             )
-        sur.blit(self.title_sur, self.transform.pos)
+        sur.blit(self.title_sur, self.transform.pos - origin)
 
 
 def main():
@@ -327,13 +385,13 @@ def main():
     pygame.display.set_caption("Bar Plot")
     screen = pygame.display.set_mode((W, H))
 
+    RenderManager().dirty_rects_mode = True
+    RenderManager().background = BG
     UpdateManager().start_fixed_update_loop()
     while not GameManager().should_exit:
-        screen.fill(BG)
         GameManager().update()
         GameManager().render(screen)
-        # GameManager().render_debug(screen)
-        pygame.display.flip()
+        GameManager().present()
     UpdateManager().stop_fixed_update_loop()
 
 
@@ -1,9 +1,14 @@
-from dataclasses import dataclass
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
 from enum import Enum
-from math import pi, sin
+from math import ceil, floor, pi, sin, ulp
 import multiprocessing
 import multiprocessing.queues
-from threading import Timer
+import os
+import queue
+import random
+import struct
+from threading import Lock, Thread, Timer
 import time
 import pygame
 from pygame import Color, Rect, Vector2, Surface
@@ -13,6 +18,7 @@ from typing import (
     Dict,
     List,
     MutableSequence,
+    Optional,
     Sequence,
     Set,
     Tuple,
@@ -21,6 +27,12 @@ from typing import (
     TypeVar
 )
 import bisect
+from collections import OrderedDict, defaultdict
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
 
 class Singelton(ABCMeta):
@@ -52,6 +64,7 @@ def Vector2Down():
 
 
 class Size(Vector2):
+    __slots__ = ()
 
     @overload
     def __init__(self, w: float, h: float) -> None: ...
@@ -88,13 +101,195 @@ class Size(Vector2):
 #     return vec
 
 
+class _TrackedVector:
+    """
+    Vector2 mixin that calls _on_change after every in-place mutation,
+    so PooledTransform can write its vectors through to the pool row.
+    Vectors derived from it (by arithmetic, copy() or pickling)
+    are plain _plain_type vectors.
+    """
+
+    __slots__ = ()
+    _plain_type = Vector2
+
+    def __reduce__(self):
+        return (self._plain_type, (self.x, self.y))
+
+    def _notify(self):
+        on_change = getattr(self, "_on_change", None)
+        if on_change is not None:
+            on_change()
+
+    def __setattr__(self, name, value):
+        super().__setattr__(name, value)
+        if name != "_on_change":
+            self._notify()
+
+
+def _tracked_inplace(name):
+    def tracked(self, *args, **kwargs):
+        result = getattr(super(_TrackedVector, self), name)(*args, **kwargs)
+        self._notify()
+        return result
+
+    tracked.__name__ = name
+    return tracked
+
+
+def _plain_result(name):
+    def plain(self, *args, **kwargs):
+        result = getattr(super(_TrackedVector, self), name)(*args, **kwargs)
+        if isinstance(result, _TrackedVector):
+            return self._plain_type(result)
+        return result
+
+    plain.__name__ = name
+    return plain
+
+
+for _name in (
+    "__add__",
+    "__radd__",
+    "__sub__",
+    "__rsub__",
+    "__mul__",
+    "__rmul__",
+    "__truediv__",
+    "__rtruediv__",
+    "__floordiv__",
+    "__rfloordiv__",
+    "__neg__",
+    "__pos__",
+    "__copy__",
+    "copy",
+    "normalize",
+    "rotate",
+    "rotate_rad",
+    "reflect",
+    "lerp",
+    "slerp",
+    "project",
+    "clamp_magnitude",
+    "move_towards",
+):
+    if hasattr(Vector2, _name):
+        setattr(_TrackedVector, _name, _plain_result(_name))
+
+for _name in (
+    "__iadd__",
+    "__isub__",
+    "__imul__",
+    "__itruediv__",
+    "__ifloordiv__",
+    "__setitem__",
+    "update",
+    "normalize_ip",
+    "scale_to_length",
+    "rotate_ip",
+    "rotate_ip_rad",
+    "rotate_rad_ip",
+    "reflect_ip",
+    "clamp_magnitude_ip",
+    "move_towards_ip",
+    "from_polar",
+):
+    if hasattr(Vector2, _name):
+        setattr(_TrackedVector, _name, _tracked_inplace(_name))
+
+
+class _TrackedPos(_TrackedVector, Vector2):
+    __slots__ = ("_on_change",)
+
+    def __init__(self, on_change: Callable[[], None], *args):
+        super().__init__(*args)
+        self._on_change = on_change
+
+
+class _TrackedSize(_TrackedVector, Size):
+    __slots__ = ("_on_change",)
+    _plain_type = Size
+
+    def __init__(self, on_change: Callable[[], None], *args):
+        super().__init__(*args)
+        self._on_change = on_change
+
+
 class Transform:
+    """
+    Position and size of an entity.
+
+    pos and size are plain vectors, assigning them stores the given
+    vector (copy() it to keep the two independent).
+
+    set_parent() attaches the transform to a parent transform: pos stays
+    the world position and local_pos is the position relative to the
+    parent (the same as pos for a root transform). A child's world
+    position is cached and recalculated lazily when it is read, so moving
+    a parent costs nothing until its descendants are looked at.
+
+    rect() is cached until pos or size change, so the returned Rect is
+    shared and must not be modified (copy() it first).
+    """
+
+    __slots__ = ("pos", "size", "parent", "children", "_link", "_rect_cache")
+
     def __init__(self):
         self.pos = Pos()
         self.size = Size(0, 0)
+        self.parent: Transform = None
+        # most transforms never get children, the list is made for the first
+        self.children: Sequence[Transform] = ()
+        self._link: _ParentLink = None
+        self._rect_cache: list = None
+
+    @property
+    def local_pos(self) -> Pos:
+        return self.pos
 
-    def rect(self):
-        return Rect(self.pos, self.size)
+    @local_pos.setter
+    def local_pos(self, local_pos: Pos):
+        self.pos = local_pos
+
+    def set_parent(self, parent: "Transform"):
+        """
+        Attach to parent (or detach with None) keeping the world position
+        """
+        if parent is not None and type(self) not in (Transform, _ChildTransform):
+            raise TypeError(f"{type(self).__name__} must be a root transform")
+        pos = Pos(self.pos)
+        if self.parent:
+            self.parent._remove_child(self)
+        self.parent = parent
+        if parent:
+            parent._add_child(self)
+            self.__class__ = _ChildTransform
+            self._link = _ParentLink()
+        elif self._link is not None:
+            self.__class__ = Transform
+            self._link = None
+        self.pos = pos
+
+    def _add_child(self, child: "Transform"):
+        if not self.children:
+            self.children = [child]
+        else:
+            self.children.append(child)
+
+    def _remove_child(self, child: "Transform"):
+        self.children.remove(child)
+
+    def rect(self) -> Rect:
+        pos = self.pos
+        size = self.size
+        cache = self._rect_cache
+        if cache is None:
+            cache = self._rect_cache = [None, _Snapshot(), _Snapshot()]
+        elif cache[1] == pos and cache[2] == size:
+            return cache[0]
+        cache[0] = Rect(pos, size)
+        cache[1][:] = pos
+        cache[2][:] = size
+        return cache[0]
 
     @property
     def center(self):
@@ -104,6 +299,435 @@ class Transform:
     def center(self, center: Pos):
         self.pos = center - self.size / 2
 
+    def __getstate__(self):
+        # the slots themselves, _ChildTransform.pos is a property over _link
+        return tuple(slot.__get__(self) for slot in _transform_slots)
+
+    def __setstate__(self, state):
+        for slot, value in zip(_transform_slots, state):
+            slot.__set__(self, value)
+
+
+_transform_slots = [Transform.__dict__[name] for name in Transform.__slots__]
+
+
+class _Snapshot(Vector2):
+    """
+    A copy of a vector to compare it with later, exactly
+    (without Vector2's default epsilon)
+    """
+
+    __slots__ = ()
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        # vectors are equal when they differ by less than epsilon
+        self.epsilon = ulp(0.0)
+
+    def __reduce__(self):
+        return (_Snapshot, (self.x, self.y))
+
+
+class _ParentLink:
+    """
+    The cached world position and local_pos of a _ChildTransform, and
+    the positions the world position was calculated from, to notice
+    when any of them moved
+    """
+
+    __slots__ = ("pos", "local_pos", "seen_parent_pos", "seen_local_pos", "seen_pos")
+
+    def __init__(self):
+        self.pos = Pos()
+        self.local_pos = Pos()
+        self.seen_parent_pos = _Snapshot()
+        self.seen_local_pos = _Snapshot()
+        self.seen_pos = _Snapshot()
+
+
+class _ChildTransform(Transform):
+    """
+    A Transform with a parent, set_parent() switches between the two.
+    pos is recalculated from the parent's pos and local_pos when read,
+    in place edits of pos or local_pos are picked up on the next read.
+    The Transform.pos slot is left unused.
+    """
+
+    __slots__ = ()
+
+    @property
+    def pos(self) -> Pos:
+        link = self._link
+        pos = link.pos
+        parent_pos = self.parent.pos
+        if link.seen_pos == pos:
+            if (
+                link.seen_parent_pos == parent_pos
+                and link.seen_local_pos == link.local_pos
+            ):
+                return pos
+        else:
+            # moved in place through a reference to pos
+            link.local_pos[:] = pos - link.seen_parent_pos
+        pos[:] = parent_pos
+        pos += link.local_pos
+        link.seen_parent_pos[:] = parent_pos
+        link.seen_local_pos[:] = link.local_pos
+        link.seen_pos[:] = pos
+        return pos
+
+    @pos.setter
+    def pos(self, pos: Pos):
+        link = self._link
+        parent_pos = self.parent.pos
+        link.local_pos[:] = pos - parent_pos
+        link.pos[:] = pos
+        link.seen_parent_pos[:] = parent_pos
+        link.seen_local_pos[:] = link.local_pos
+        link.seen_pos[:] = pos
+
+    @property
+    def local_pos(self) -> Pos:
+        self.pos  # picks up in place edits of pos
+        return self._link.local_pos
+
+    @local_pos.setter
+    def local_pos(self, local_pos: Pos):
+        self.pos
+        self._link.local_pos[:] = local_pos
+
+
+class PooledTransform(Transform):
+    """
+    Transform whose pos, size and vel live in a row of TransformPool()
+    while its entity is alive, so the pool can integrate pos += vel * dt
+    for every pooled transform in one vectorized operation.
+    Opt in by assigning self.transform = PooledTransform() in __init__.
+
+    acc, gravity_scale and drag are integrated as well (see Body),
+    they default to no effect.
+
+    A pooled transform must be a root, it can still have children.
+    Requires numpy.
+    """
+
+    __slots__ = (
+        "_pos",
+        "_size",
+        "_vel",
+        "_acc",
+        "_gravity_scale",
+        "_drag",
+        "_pool",
+        "_row",
+        "_generation",
+    )
+
+    def __init__(self):
+        self._pool: TransformPool = None
+        self._row = -1
+        self._generation = 0
+        # before Transform.__init__ assigns them through the properties
+        self._pos = _TrackedPos(self._on_pos_changed)
+        self._size = _TrackedSize(self._on_size_changed, 0, 0)
+        super().__init__()
+        self._vel = _TrackedPos(self._on_vel_changed)
+        self._acc = _TrackedPos(self._on_acc_changed)
+        self._gravity_scale = 0.0
+        self._drag = 0.0
+
+    def _sync(self):
+        # the pool changed rows behind our back (integrate), reload ours
+        pool = self._pool
+        if pool is not None and self._generation != pool.generation:
+            self._generation = pool.generation
+            Vector2.update(self._pos, pool._pos[self._row].tolist())
+            Vector2.update(self._vel, pool._vel[self._row].tolist())
+
+    @property
+    def pos(self) -> Pos:
+        self._sync()
+        return self._pos
+
+    @pos.setter
+    def pos(self, pos: Pos):
+        if pos is not self._pos:
+            self._pos.update(pos)
+
+    @property
+    def size(self) -> Size:
+        return self._size
+
+    @size.setter
+    def size(self, size: Size):
+        if size is not self._size:
+            self._size.update(size)
+
+    @property
+    def vel(self) -> Vector2:
+        self._sync()
+        return self._vel
+
+    @vel.setter
+    def vel(self, vel: Vector2):
+        if vel is not self._vel:
+            self._vel.update(vel)
+
+    @property
+    def acc(self) -> Vector2:
+        return self._acc
+
+    @acc.setter
+    def acc(self, acc: Vector2):
+        if acc is not self._acc:
+            self._acc.update(acc)
+
+    @property
+    def gravity_scale(self) -> float:
+        return self._gravity_scale
+
+    @gravity_scale.setter
+    def gravity_scale(self, gravity_scale: float):
+        self._gravity_scale = gravity_scale
+        if self._pool is not None:
+            self._pool._gravity_scale[self._row] = gravity_scale
+
+    @property
+    def drag(self) -> float:
+        return self._drag
+
+    @drag.setter
+    def drag(self, drag: float):
+        self._drag = drag
+        if self._pool is not None:
+            self._pool._drag[self._row] = drag
+
+    def set_parent(self, parent: Transform):
+        if parent is not None:
+            raise ValueError("PooledTransform must be a root transform")
+        super().set_parent(parent)
+
+    def __getstate__(self):
+        # copies and unpickled transforms are not pooled until their entity starts
+        self._sync()
+        return {
+            "pos": Pos(self._pos),
+            "size": Size(self._size),
+            "vel": Vector2(self._vel),
+            "acc": Vector2(self._acc),
+            "gravity_scale": self._gravity_scale,
+            "drag": self._drag,
+            "children": self.children,
+        }
+
+    def __setstate__(self, state):
+        # rebuild the tracked vectors, bound to this transform
+        PooledTransform.__init__(self)
+        for name, value in state.items():
+            setattr(self, name, value)
+
+    def _on_pos_changed(self):
+        if self._pool is not None:
+            self._pool._pos[self._row] = self._pos
+
+    def _on_size_changed(self):
+        if self._pool is not None:
+            self._pool._size[self._row] = self._size
+
+    def _on_vel_changed(self):
+        if self._pool is not None:
+            self._pool._vel[self._row] = self._vel
+
+    def _on_acc_changed(self):
+        if self._pool is not None:
+            self._pool._acc[self._row] = self._acc
+
+
+class TransformPool(metaclass=Singelton):
+    """
+    Struct-of-arrays store for the positions, sizes and velocities of
+    every live PooledTransform. pos, size and vel are (count, 2) views
+    of the active rows. Code that writes into them directly should call
+    mark_changed() so the transforms reload their rows.
+    """
+
+    INITIAL_CAPACITY = 256
+    COLUMNS = ("_pos", "_size", "_vel", "_acc", "_gravity_scale", "_drag")
+
+    def __init__(self):
+        if np is None:
+            raise ImportError("TransformPool requires numpy")
+        self._pos = np.zeros((TransformPool.INITIAL_CAPACITY, 2))
+        self._size = np.zeros((TransformPool.INITIAL_CAPACITY, 2))
+        self._vel = np.zeros((TransformPool.INITIAL_CAPACITY, 2))
+        self._acc = np.zeros((TransformPool.INITIAL_CAPACITY, 2))
+        self._gravity_scale = np.zeros(TransformPool.INITIAL_CAPACITY)
+        self._drag = np.zeros(TransformPool.INITIAL_CAPACITY)
+        self.count = 0
+        self.generation = 0
+        self.transforms: List[PooledTransform] = []
+
+    @property
+    def pos(self):
+        return self._pos[: self.count]
+
+    @property
+    def size(self):
+        return self._size[: self.count]
+
+    @property
+    def vel(self):
+        return self._vel[: self.count]
+
+    def _grow(self):
+        capacity = len(self._pos) * 2
+        for name in TransformPool.COLUMNS:
+            column = getattr(self, name)
+            grown = np.zeros((capacity,) + column.shape[1:])
+            grown[: self.count] = column[: self.count]
+            setattr(self, name, grown)
+
+    def add(self, transform: PooledTransform):
+        if transform._pool is not None:
+            return
+        if self.count == len(self._pos):
+            self._grow()
+        row = self.count
+        self._pos[row] = transform._pos
+        self._size[row] = transform._size
+        self._vel[row] = transform._vel
+        self._acc[row] = transform._acc
+        self._gravity_scale[row] = transform._gravity_scale
+        self._drag[row] = transform._drag
+        transform._pool = self
+        transform._row = row
+        transform._generation = self.generation
+        self.transforms.append(transform)
+        self.count += 1
+
+    def remove(self, transform: PooledTransform):
+        if transform._pool is not self:
+            return
+        transform._sync()
+        row = transform._row
+        last = self.count - 1
+        if row != last:
+            moved = self.transforms[last]
+            for name in TransformPool.COLUMNS:
+                column = getattr(self, name)
+                column[row] = column[last]
+            self.transforms[row] = moved
+            moved._row = row
+        self.transforms.pop()
+        self.count -= 1
+        transform._pool = None
+        transform._row = -1
+
+    def mark_changed(self):
+        self.generation += 1
+
+    def integrate(self, dt: float):
+        count = self.count
+        if count == 0:
+            return
+        vel = self._vel[:count]
+        vel += (
+            self._acc[:count]
+            + np.multiply.outer(self._gravity_scale[:count], BodyManager.GRAVITY)
+        ) * dt
+        vel /= (1 + self._drag[:count] * dt)[:, None]
+        self._pos[:count] += vel * dt
+        self.mark_changed()
+
+
+class Body:
+    """
+    Velocity, acceleration, gravity scale and drag of an entity.
+    The engine integrates every body once per fixed update, don't
+    integrate it yourself. Create it with Entity.add_body().
+    """
+
+    __slots__ = ("transform", "velocity", "acceleration", "gravity_scale", "drag")
+
+    def __init__(
+        self,
+        transform: Transform,
+        velocity: Vector2 = None,
+        acceleration: Vector2 = None,
+        gravity_scale: float = 1.0,
+        drag: float = 0.0,
+    ):
+        self.transform = transform
+        self.velocity = Vector2() if velocity is None else Vector2(velocity)
+        self.acceleration = Vector2() if acceleration is None else Vector2(acceleration)
+        self.gravity_scale = gravity_scale
+        self.drag = drag
+
+
+class _PooledBody(Body):
+    # the state lives in the PooledTransform row and is integrated by TransformPool
+
+    __slots__ = ()
+
+    @property
+    def velocity(self) -> Vector2:
+        return self.transform.vel
+
+    @velocity.setter
+    def velocity(self, velocity: Vector2):
+        self.transform.vel = velocity
+
+    @property
+    def acceleration(self) -> Vector2:
+        return self.transform.acc
+
+    @acceleration.setter
+    def acceleration(self, acceleration: Vector2):
+        self.transform.acc = acceleration
+
+    @property
+    def gravity_scale(self) -> float:
+        return self.transform.gravity_scale
+
+    @gravity_scale.setter
+    def gravity_scale(self, gravity_scale: float):
+        self.transform.gravity_scale = gravity_scale
+
+    @property
+    def drag(self) -> float:
+        return self.transform.drag
+
+    @drag.setter
+    def drag(self, drag: float):
+        self.transform.drag = drag
+
+
+class BodyManager(metaclass=Singelton):
+    """
+    Integrates bodies that are not pooled (no numpy, or the transform
+    is part of a hierarchy). Pooled bodies are integrated by TransformPool.
+    """
+
+    GRAVITY = Vector2(0, 0)
+
+    def __init__(self):
+        self.bodies: List[Body] = []
+
+    def register(self, body: Body):
+        self.bodies.append(body)
+
+    def unregister(self, body: Body):
+        self.bodies.remove(body)
+
+    def integrate(self, dt: float):
+        gravity = BodyManager.GRAVITY
+        for body in self.bodies:
+            velocity = body.velocity
+            velocity += (body.acceleration + gravity * body.gravity_scale) * dt
+            if body.drag:
+                velocity /= 1 + body.drag * dt
+            body.transform.pos += velocity * dt
+
 
 class EntityState(Enum):
     Initialized = (0,)
@@ -133,16 +757,45 @@ class Entity(ABC):
     kill() nor start() directly. Use GameManager().instatiate()
     and GameManager().destroy() in your start() implementation
     instead.
+
+    Entity itself is slotted, subclasses get a __dict__ unless they
+    declare __slots__ (see SlottedEntity).
     """
 
+    # kill() drops the entity's input callbacks, unless it lives on
+    # (SingeltonEntity re-instantiates itself without running __init__)
+    KEEP_INPUT_CALLBACKS = False
+    # record()ed commands are replayed until the screen rect changes, the
+    # entity then has to call mark_dirty() whenever its look changes
+    REPLAY_COMMANDS = False
+
+    __slots__ = (
+        "transform",
+        "_z_index",
+        "_update_order",
+        "should_render",
+        "optional_render",
+        "state",
+        "parent",
+        "body",
+        "screen_space",
+        "_static",
+        "__weakref__",
+    )
+
     def __init__(self):
         self.transform = Transform()
         self._z_index = 0
         self._update_order = 0
         self.should_render = True
+        # optional renders are the first to go when the frame budget is exceeded
+        self.optional_render = False
         self.state = EntityState.Initialized
-        self.offset_parent = Pos(0, 0)
         self.parent: Entity = None
+        self.body: Body = None
+        # screen space entities (UI) ignore RenderManager().camera
+        self.screen_space = False
+        self._static = False
 
     def start(self):
         """
@@ -150,15 +803,17 @@ class Entity(ABC):
         """
         RenderManager().register(self)
         UpdateManager().register(self)
+        if isinstance(self.transform, PooledTransform):
+            TransformPool().add(self.transform)
+        elif self.body:
+            BodyManager().register(self.body)
         self.state = EntityState.Started
 
     def update(self, dt):
         """
         Will be called before every frame
         """
-        if self.parent:
-            self.transform.pos += self.parent.transform.pos - self.offset_parent
-            self.offset_parent = self.parent.transform.pos.copy()
+        pass
 
     def fixed_update(self, fixed_dt):
         """
@@ -171,26 +826,73 @@ class Entity(ABC):
         """
         Should be the only interaction with the screen's surface
         """
+        if type(self).record is not Entity.record:
+            commands = RenderCommands()
+            self.record(commands)
+            RenderCommands.execute(sur, commands.commands)
+
+    def record(self, commands: "RenderCommands"):
+        """
+        Instead of render(): add draw commands for RenderManager
+        to merge with other entities' and execute later. With
+        REPLAY_COMMANDS they are replayed until the screen rect
+        changes or mark_dirty() is called.
+        """
         pass
 
+    def mark_dirty(self):
+        """
+        In dirty rects mode, redraw this entity on the next frame
+        even if its transform didn't change
+        """
+        RenderManager().mark_dirty(self)
+
     def render_debug(self, sur: Surface):
         axis_length = 20
+        screen_pos = self.screen_pos()
         pygame.draw.line(
             sur,
             Color("Grey"),
-            self.transform.pos + Vector2Left() * axis_length / 2,
-            self.transform.pos + Vector2Right() * axis_length / 2,
+            screen_pos + Vector2Left() * axis_length / 2,
+            screen_pos + Vector2Right() * axis_length / 2,
         )
         pygame.draw.line(
             sur,
             Color("Grey"),
-            self.transform.pos + Vector2Up() * axis_length / 2,
-            self.transform.pos + Vector2Down() * axis_length / 2,
+            screen_pos + Vector2Up() * axis_length / 2,
+            screen_pos + Vector2Down() * axis_length / 2,
         )
         type_name_sur = GameManager().font.render(
             type(self).__name__, False, Color("Grey")
         )
-        sur.blit(type_name_sur, self.transform.pos)
+        sur.blit(type_name_sur, screen_pos)
+
+    def screen_pos(self) -> Pos:
+        """
+        transform.pos on the screen, through RenderManager().camera
+        """
+        render_manager = RenderManager()
+        camera = render_manager.camera
+        if camera is None or self.screen_space:
+            pos = Pos(self.transform.pos)
+        else:
+            pos = camera.world_to_screen(self.transform.pos)
+        if render_manager.view_scale != 1:
+            pos *= render_manager.view_scale
+        return pos
+
+    def screen_rect(self) -> Rect:
+        """
+        transform.rect() on the screen, through RenderManager().camera
+        """
+        return RenderManager().screen_rect_of(self)
+
+    def render_bounds(self) -> Rect:
+        """
+        The screen rect render() draws in, culling and dirty rects use it.
+        Override it when drawing outside screen_rect()
+        """
+        return self.screen_rect()
 
     def kill(self):
         """
@@ -199,11 +901,55 @@ class Entity(ABC):
         """
         UpdateManager().unregister(self)
         RenderManager().unregister(self)
+        if not self.KEEP_INPUT_CALLBACKS:
+            InputManager().unregister(self)
+        # the parent would keep moving a dead child
+        if self.transform.parent is not None:
+            self.set_parent(None)
+        if isinstance(self.transform, PooledTransform):
+            TransformPool().remove(self.transform)
+        elif self.body:
+            BodyManager().unregister(self.body)
         self.state = EntityState.Destroyed
 
     def set_parent(self, parent):
+        """
+        The entity keeps its world position and from now on
+        moves with the parent (pass None to detach)
+        """
         self.parent = parent
-        self.offset_parent = self.parent.transform.pos.copy()
+        self.transform.set_parent(parent.transform if parent else None)
+
+    def add_body(
+        self,
+        velocity: Vector2 = None,
+        acceleration: Vector2 = None,
+        gravity_scale: float = 1.0,
+        drag: float = 0.0,
+    ) -> "Body":
+        """
+        Opt in to engine integrated kinematics, call it from __init__.
+        With numpy the transform becomes a PooledTransform (unless it is
+        already part of a hierarchy), so all bodies are integrated in one
+        vectorized pass. Otherwise BodyManager integrates it in Python.
+        """
+        body_type = Body
+        if np is not None:
+            if (
+                type(self.transform) is Transform
+                and self.transform.parent is None
+                and not self.transform.children
+            ):
+                pooled = PooledTransform()
+                pooled.pos = self.transform.pos
+                pooled.size = self.transform.size
+                self.transform = pooled
+            if isinstance(self.transform, PooledTransform):
+                body_type = _PooledBody
+        self.body = body_type(
+            self.transform, velocity, acceleration, gravity_scale, drag
+        )
+        return self.body
 
     @property
     def z_index(self):
@@ -215,10 +961,29 @@ class Entity(ABC):
             RenderManager().unregister(self)
             self._z_index = z_index
             RenderManager().register(self)
-            InputManager().update_callbacks_order()
+            InputManager().update_callbacks_order(self)
+            self.mark_dirty()
         else:
             self._z_index = z_index
 
+    @property
+    def static(self):
+        """
+        Static entities are rendered once into their z_index layer surface
+        (see RenderManager.set_static_layer), call mark_dirty() when one
+        looks different without moving
+        """
+        return self._static
+
+    @static.setter
+    def static(self, static):
+        if self.state == EntityState.Started:
+            RenderManager().unregister(self)
+            self._static = static
+            RenderManager().register(self)
+        else:
+            self._static = static
+
     @property
     def update_order(self):
         return self._update_order
@@ -233,17 +998,55 @@ class Entity(ABC):
             self._update_order = update_order
 
 
+class SlottedEntity(Entity):
+    """
+    Opt-in compact entity. Every subclass must declare __slots__
+    (listing only the attributes it adds) so no instance carries a
+    __dict__. Use it for entities that exist in large numbers.
+    """
+
+    __slots__ = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if "__slots__" not in cls.__dict__:
+            raise TypeError(
+                f"{cls.__name__} derives from SlottedEntity, declare __slots__"
+            )
+
+
 CollisionFunction = Callable[[Entity, Entity], None]
 
 
 # TODO:
 # get rid of this discusting useless dataclass
-@dataclass
+@dataclass(slots=True)
 class CollisionData:
     type_other: type  # the mro for this type must contain CollideEntity
     collision_function: CollisionFunction
 
 
+class Sprite(Entity):
+    """
+    An image drawn at transform.pos (screen_pos() with a camera,
+    the image isn't scaled by the zoom). RenderManager draws runs of
+    consecutive sprites that don't override render() with a single
+    Surface.blits call instead of calling each one's render().
+    """
+
+    __slots__ = ("image",)
+
+    def __init__(self, image: Surface, pos: Pos = None):
+        super().__init__()
+        self.image = image
+        if pos is not None:
+            self.transform.pos = pos
+        self.transform.size = Size(image.get_size())
+
+    def render(self, sur: Surface):
+        sur.blit(self.image, self.screen_pos())
+
+
 class CollideEntity(Entity):
     """
     This class automatically register the object
@@ -253,6 +1056,8 @@ class CollideEntity(Entity):
     method register_collision_functions().
     """
 
+    __slots__ = ()
+
     # Yuk!
     @classmethod
     def register_collision_functions(cls) -> list[CollisionData]:
@@ -310,6 +1115,7 @@ class UpdateManager(metaclass=Singelton):
         self.fixed_update_running = True
         self.fixed_update_timer = None
         self.debug_info: Dict[Entity, float] = {}
+        self.fixed_update_count = 0
 
     def register(self, entity: Entity):
         bisect.insort_right(
@@ -322,7 +1128,7 @@ class UpdateManager(metaclass=Singelton):
         )
 
     def update(self, dt):
-        if GameManager().debug:
+        if GameManager().debug and GameManager().collect_debug_info:
             self.update_debug(dt)
         else:
             for entity in self.entityes_sorted:
@@ -337,6 +1143,9 @@ class UpdateManager(metaclass=Singelton):
             self.debug_info[entity] = finish_time - start_time
 
     def start_fixed_update_loop(self):
+        if InputManager().mode is InputMode.Replay:
+            # GameManager().update runs the recorded fixed update steps
+            return
         self.fixed_update_timer = Timer(
             UpdateManager.FIXED_DT, self.start_fixed_update_loop
         )
@@ -348,8 +1157,16 @@ class UpdateManager(metaclass=Singelton):
             self.fixed_update_timer.cancel()
 
     def fixed_update(self):
+        self.fixed_update_count += 1
+        start = time.perf_counter_ns()
         ColliderManager().update()
-        if GameManager().debug:
+        # runs on the fixed update Timer thread
+        FrameBudgetManager().record_threaded("collision", start)
+        transform_pool = Singelton._instances.get(TransformPool)
+        if transform_pool is not None:
+            transform_pool.integrate(UpdateManager.FIXED_DT)
+        BodyManager().integrate(UpdateManager.FIXED_DT)
+        if GameManager().debug and GameManager().collect_debug_info:
             self.fixed_update_debug()
         else:
             for entity in self.entityes_sorted:
@@ -366,26 +1183,712 @@ class UpdateManager(metaclass=Singelton):
             self.debug_info[entity] += fixed_update_time
 
 
+class Camera:
+    """
+    Maps world coordinates to the screen:
+    screen = viewport.center + (world - pos) * zoom
+
+    pos is the world position at the center of the viewport.
+    viewport is the screen rect the camera draws to, None means
+    the whole target surface.
+    Set RenderManager().camera to cull against view_rect and clip
+    to the viewport, entities then draw with screen_rect() / screen_pos().
+    """
+
+    def __init__(self, pos: Pos = None, zoom: float = 1.0, viewport: Rect = None):
+        self.pos = Pos() if pos is None else Pos(pos)
+        self.zoom = zoom
+        self.viewport = viewport
+        surface = pygame.display.get_surface()
+        self.target_rect = surface.get_rect() if surface else Rect(0, 0, 0, 0)
+
+    @property
+    def screen_rect(self) -> Rect:
+        return self.viewport if self.viewport else self.target_rect
+
+    def world_to_screen(self, pos: Pos) -> Pos:
+        return (Pos(pos) - self.pos) * self.zoom + self.screen_rect.center
+
+    def screen_to_world(self, pos: Pos) -> Pos:
+        return (Pos(pos) - self.screen_rect.center) / self.zoom + self.pos
+
+    def world_to_screen_rect(self, rect: Rect) -> Rect:
+        return Rect(self.world_to_screen(rect.topleft), Size(rect.size) * self.zoom)
+
+    @property
+    def view_rect(self) -> Rect:
+        """
+        The world rect seen by the camera
+        """
+        screen_rect = self.screen_rect
+        return Rect(
+            self.screen_to_world(screen_rect.topleft),
+            Size(screen_rect.size) / self.zoom,
+        )
+
+
+class DrawOp(Enum):
+    Rect = 0
+    Circle = 1
+    Line = 2
+    Blit = 3
+
+
+class RenderCommands:
+    """
+    Draw commands recorded by Entity.record(), in screen coordinates
+    """
+
+    __slots__ = ("commands",)
+
+    def __init__(self):
+        self.commands: List[tuple] = []
+
+    def rect(self, color, rect: Rect, width: int = 0):
+        self.commands.append((DrawOp.Rect, color, Rect(rect), width))
+
+    def circle(self, color, center: Pos, radius: float, width: int = 0):
+        self.commands.append((DrawOp.Circle, color, Pos(center), radius, width))
+
+    def line(self, color, start: Pos, end: Pos, width: int = 1):
+        self.commands.append((DrawOp.Line, color, Pos(start), Pos(end), width))
+
+    def blit(self, source: Surface, dest: Pos):
+        self.commands.append((DrawOp.Blit, source, Pos(dest[0], dest[1])))
+
+    def text(self, font: pygame.font.Font, text: str, color, dest: Pos):
+        self.blit(font.render(text, True, color), dest)
+
+    @staticmethod
+    def execute(sur: Surface, commands: List[tuple]):
+        """
+        Runs of blits go to a single blits call and
+        runs of filled rects to Surface.fill
+        """
+        i = 0
+        count = len(commands)
+        while i < count:
+            command = commands[i]
+            op = command[0]
+            if op is DrawOp.Blit:
+                j = i + 1
+                while j < count and commands[j][0] is DrawOp.Blit:
+                    j += 1
+                RenderManager.blit_batch(
+                    sur, [(command[1], command[2]) for command in commands[i:j]]
+                )
+                i = j
+                continue
+            if op is DrawOp.Rect:
+                if command[3] == 0:
+                    sur.fill(command[1], command[2])
+                else:
+                    pygame.draw.rect(sur, command[1], command[2], command[3])
+            elif op is DrawOp.Circle:
+                pygame.draw.circle(sur, *command[1:])
+            elif op is DrawOp.Line:
+                pygame.draw.line(sur, *command[1:])
+            i += 1
+
+
+@dataclass(slots=True, eq=False)
+class StaticLayer:
+    """
+    The cached rendering of the static entities sharing a z_index
+    """
+
+    # members in render order, a dict for O(1) membership
+    members: Dict[Entity, None] = field(default_factory=dict)
+    surface: Surface = None
+    # the part of surface the members draw on
+    area: Rect = None
+    # members' screen rects when the surface was rendered
+    rects: List[Rect] = None
+    valid: bool = False
+
+
 class RenderManager(metaclass=Singelton):
+    # past this many regions the dirty rects are merged into one
+    MAX_DIRTY_RECTS = 16
+    # drawing with float coordinates may round a pixel past the rect
+    DIRTY_RECT_PADDING = 2
+    RENDER_THREADS = min(4, os.cpu_count() or 1)
+
     def __init__(self):
         self.entityes_sorted: List[Entity] = []
         self.debug_info: Dict[Entity, float] = {}
+        self.skip_optional = False
+        # skip entities with a non-empty rect outside the view
+        self.cull = True
+        self.culled_count = 0
+        self.camera: Camera = None
+        # entities lay out in display coordinates, the render target is
+        # view_scale times that (GameManager().render_scale)
+        self.view_scale = 1.0
+        self._scaled_images: Dict[Surface, Surface] = {}
+        # dirty rects mode: only the regions that changed are cleared with
+        # background and redrawn, GameManager().present() updates only them
+        self.dirty_rects_mode = False
+        self.background: Color | Surface = Color("Black")
+        self.dirty_rects: List[Rect] = []
+        self._last_rects: Dict[Entity, Rect] = {}
+        self._marked: set[Entity] = set()
+        self._full_redraw = True
+        # z_indices whose entities are all static
+        self.static_z_indices: set[int] = set()
+        self.static_layers: Dict[int, StaticLayer] = {}
+        # z_indices rendered on render_pool, see set_independent_layer
+        self.independent_z_indices: set[int] = set()
+        self.layer_surfaces: Dict[int, Surface] = {}
+        self.render_pool: ThreadPoolExecutor = None
+        # registered sprites that don't override Sprite.render
+        self.sprites: set[Entity] = set()
+        self.batch_sprites = True
+        # registered entities that draw with record() instead of render()
+        self.recorders: set[Entity] = set()
+        # registered entities that override Entity.render_bounds
+        self.bounded: set[Entity] = set()
+        # entity -> (its screen rect, its commands) when it recorded them,
+        # for the entities with REPLAY_COMMANDS
+        self.recorded: Dict[Entity, Tuple[Rect, RenderCommands]] = {}
+        self.replay_commands = True
 
     def register(self, entity: Entity):
         bisect.insort_right(self.entityes_sorted, entity, key=lambda item: item.z_index)
+        if type(entity).render is Sprite.render:
+            self.sprites.add(entity)
+        elif type(entity).record is not Entity.record:
+            if type(entity).render is Entity.render:
+                self.recorders.add(entity)
+        if type(entity).render_bounds is not Entity.render_bounds:
+            self.bounded.add(entity)
+        if entity.static or entity.z_index in self.static_z_indices:
+            layer = self.static_layers.setdefault(entity.z_index, StaticLayer())
+            layer.members[entity] = None
+            layer.valid = False
 
     def unregister(self, entity: Entity):
         Utils.remove_from_sorted_list(
             self.entityes_sorted, entity, key=lambda item: item.z_index
         )
+        self.sprites.discard(entity)
+        self.recorders.discard(entity)
+        self.bounded.discard(entity)
+        self.recorded.pop(entity, None)
+        layer = self.static_layers.get(entity.z_index)
+        if layer is not None and entity in layer.members:
+            del layer.members[entity]
+            layer.valid = False
+            if not layer.members:
+                del self.static_layers[entity.z_index]
+
+    def set_static_layer(self, z_index: int, static: bool = True):
+        """
+        Render all the entities with this z_index (current and future)
+        once into a cached surface that is blitted every frame
+        """
+        if static:
+            self.static_z_indices.add(z_index)
+        else:
+            self.static_z_indices.discard(z_index)
+        entities = [e for e in self.entityes_sorted if e.z_index == z_index]
+        for entity in entities:
+            self.unregister(entity)
+        for entity in entities:
+            self.register(entity)
+
+    def mark_dirty(self, entity: Entity):
+        if self.dirty_rects_mode:
+            self._marked.add(entity)
+        self.recorded.pop(entity, None)
+        layer = self.static_layers.get(entity.z_index)
+        if layer is not None and entity in layer.members:
+            layer.valid = False
+
+    def update_static_layers(self, sur: Surface):
+        """
+        Re-render the static layers that were invalidated, or whose
+        members moved or changed should_render since the last render
+        """
+        target = sur.get_rect()
+        camera = self.camera
+        for layer in self.static_layers.values():
+            rects = [
+                self.bounds_of(entity) if entity.should_render else None
+                for entity in layer.members
+            ]
+            if (
+                layer.valid
+                and rects == layer.rects
+                and layer.surface.get_size() == target.size
+            ):
+                continue
+            layer.rects = rects
+            layer.valid = True
+            if layer.surface is None or layer.surface.get_size() != target.size:
+                layer.surface = Surface(target.size, pygame.SRCALPHA)
+            layer.surface.fill((0, 0, 0, 0))
+            drawn = [rect for rect in rects if rect is not None]
+            if not drawn:
+                layer.area = Rect(0, 0, 0, 0)
+                continue
+            if all(rect.w and rect.h for rect in drawn):
+                layer.area = drawn[0].unionall(drawn[1:]).clip(target)
+            else:
+                layer.area = target
+            world_clip = (
+                target
+                if camera is None
+                else target.clip(self.to_target_rect(camera.screen_rect))
+            )
+            for entity in layer.members:
+                if entity.should_render:
+                    layer.surface.set_clip(
+                        target if entity.screen_space else world_clip
+                    )
+                    entity.render(layer.surface)
+            layer.surface.set_clip(None)
+
+    def static_layer_of(self, entity: Entity) -> StaticLayer | None:
+        layer = self.static_layers.get(entity.z_index)
+        if layer is not None and entity in layer.members:
+            return layer
+        return None
+
+    def screen_rect_of(self, entity: Entity) -> Rect:
+        camera = self.camera
+        if camera is None or entity.screen_space:
+            return self.to_target_rect(entity.transform.rect())
+        return self.to_target_rect(camera.world_to_screen_rect(entity.transform.rect()))
+
+    def bounds_of(self, entity: Entity) -> Rect:
+        """
+        entity.render_bounds(), without the call for the entities
+        that don't override it
+        """
+        if entity in self.bounded:
+            return entity.render_bounds()
+        return self.screen_rect_of(entity)
+
+    def set_view_scale(self, scale: float):
+        if scale != self.view_scale:
+            self.view_scale = scale
+            self._scaled_images.clear()
+            self.invalidate()
+            for layer in self.static_layers.values():
+                layer.valid = False
+
+    def to_target_rect(self, rect: Rect) -> Rect:
+        """
+        rect in display coordinates on the render target, see view_scale
+        """
+        scale = self.view_scale
+        if scale == 1:
+            return rect
+        left = floor(rect.left * scale)
+        top = floor(rect.top * scale)
+        return Rect(
+            left, top, ceil(rect.right * scale) - left, ceil(rect.bottom * scale) - top
+        )
+
+    def view_of(self, sur: Surface) -> Rect:
+        """
+        The display coordinates rect that sur (the render target) shows
+        """
+        scale = self.view_scale
+        if scale == 1:
+            return sur.get_rect()
+        return Rect(0, 0, ceil(sur.get_width() / scale), ceil(sur.get_height() / scale))
+
+    def scaled_image(self, image: Surface) -> Surface:
+        """
+        image scaled by view_scale, cached until view_scale changes
+        """
+        if self.view_scale == 1:
+            return image
+        scaled = self._scaled_images.get(image)
+        if scaled is None:
+            scaled = pygame.transform.scale_by(image, self.view_scale)
+            self._scaled_images[image] = scaled
+        return scaled
+
+    def invalidate(self):
+        """
+        Redraw the whole surface on the next dirty rects render
+        (e.g. after the background or the display mode changed)
+        """
+        self._full_redraw = True
+
+    def clear(self, sur: Surface, rect: Rect):
+        if isinstance(self.background, Surface):
+            sur.blit(self.background, rect, rect)
+        else:
+            sur.fill(self.background, rect)
 
     def render(self, sur: Surface):
-        if GameManager().debug:
+        if self.dirty_rects_mode:
+            if not GameManager().debug:
+                self.render_dirty(sur)
+                return
+            # the debug overlay draws all over the screen, repaint it whole
+            self.clear(sur, sur.get_rect())
+            self.dirty_rects = [sur.get_rect()]
+            self._full_redraw = True
+        if GameManager().debug and GameManager().collect_debug_info:
             self.render_debug(sur)
         else:
-            for entity in self.entityes_sorted:
-                if entity.should_render:
+            skip_optional = self.skip_optional
+            camera = self.camera
+            static_layers = self.static_layers
+            drawn_layers: List[StaticLayer] = []
+            # sprites and recorded entities add their draw commands to batch,
+            # it's executed (merged) before anything else draws
+            sprites = self.sprites if self.batch_sprites else ()
+            recorders = self.recorders
+            batch: List[tuple] = []
+            independent = self.independent_z_indices
+            view_scale = self.view_scale
+            if camera is None:
+                if static_layers:
+                    self.update_static_layers(sur)
+                visible = self.visible_entities(self.view_of(sur))
+                if independent:
+                    layer_jobs = self.submit_independent_layers(sur, visible)
+                for entity in visible:
+                    if static_layers and (layer := self.static_layer_of(entity)):
+                        if layer not in drawn_layers:
+                            drawn_layers.append(layer)
+                            if batch:
+                                RenderCommands.execute(sur, batch)
+                                batch = []
+                            sur.blit(layer.surface, layer.area, layer.area)
+                    elif independent and entity.z_index in independent:
+                        job = layer_jobs.pop(entity.z_index, None)
+                        if job is not None:
+                            if batch:
+                                RenderCommands.execute(sur, batch)
+                                batch = []
+                            layer_sur, area = job.result()
+                            sur.blit(layer_sur, area, area)
+                    elif entity.should_render and not (
+                        skip_optional and entity.optional_render
+                    ):
+                        if entity in sprites:
+                            if view_scale == 1:
+                                batch.append(
+                                    (DrawOp.Blit, entity.image, entity.transform.pos)
+                                )
+                            else:
+                                batch.append(
+                                    (
+                                        DrawOp.Blit,
+                                        self.scaled_image(entity.image),
+                                        entity.transform.pos * view_scale,
+                                    )
+                                )
+                            continue
+                        if entity in recorders:
+                            batch.extend(self.commands_of(entity))
+                            continue
+                        if batch:
+                            RenderCommands.execute(sur, batch)
+                            batch = []
+                        entity.render(sur)
+                if batch:
+                    RenderCommands.execute(sur, batch)
+                return
+            camera.target_rect = self.view_of(sur)
+            if static_layers:
+                self.update_static_layers(sur)
+            screen_clip = sur.get_clip()
+            world_clip = screen_clip.clip(self.to_target_rect(camera.screen_rect))
+            clipped = False
+            visible = self.visible_entities(camera.target_rect, camera.view_rect)
+            if independent:
+                layer_jobs = self.submit_independent_layers(sur, visible, world_clip)
+            for entity in visible:
+                if static_layers and (layer := self.static_layer_of(entity)):
+                    # the layer surface is already clipped to the viewport
+                    if layer not in drawn_layers:
+                        drawn_layers.append(layer)
+                        if batch:
+                            RenderCommands.execute(sur, batch)
+                            batch = []
+                        if clipped:
+                            clipped = False
+                            sur.set_clip(screen_clip)
+                        sur.blit(layer.surface, layer.area, layer.area)
+                elif independent and entity.z_index in independent:
+                    job = layer_jobs.pop(entity.z_index, None)
+                    if job is not None:
+                        if batch:
+                            RenderCommands.execute(sur, batch)
+                            batch = []
+                        if clipped:
+                            clipped = False
+                            sur.set_clip(screen_clip)
+                        layer_sur, area = job.result()
+                        sur.blit(layer_sur, area, area)
+                elif entity.should_render and not (
+                    skip_optional and entity.optional_render
+                ):
+                    # world entities are clipped to the camera viewport
+                    if clipped == entity.screen_space:
+                        if batch:
+                            RenderCommands.execute(sur, batch)
+                            batch = []
+                        clipped = not clipped
+                        sur.set_clip(world_clip if clipped else screen_clip)
+                    if entity in sprites:
+                        batch.append(
+                            (
+                                DrawOp.Blit,
+                                self.scaled_image(entity.image),
+                                entity.screen_pos(),
+                            )
+                        )
+                        continue
+                    if entity in recorders:
+                        batch.extend(self.commands_of(entity))
+                        continue
+                    if batch:
+                        RenderCommands.execute(sur, batch)
+                        batch = []
                     entity.render(sur)
+            if batch:
+                RenderCommands.execute(sur, batch)
+            sur.set_clip(screen_clip)
+
+    def set_independent_layer(self, z_index: int, independent: bool = True):
+        """
+        The entities with this z_index are rendered on a worker thread
+        into their own surface, composited in z order on the main thread.
+        Their render() must only draw on the surface it gets and must not
+        touch state other entities change while rendering.
+        """
+        if independent:
+            self.independent_z_indices.add(z_index)
+        else:
+            self.independent_z_indices.discard(z_index)
+            self.layer_surfaces.pop(z_index, None)
+
+    def submit_independent_layers(
+        self, sur: Surface, visible: List[Entity], world_clip: Rect = None
+    ) -> Dict[int, Tuple[Future, Rect]]:
+        """
+        Start rendering the independent layers of visible, the futures
+        result in (layer surface, the area its entities draw on)
+        """
+        target = sur.get_rect()
+        skip_optional = self.skip_optional
+        layers: Dict[int, List[Entity]] = {}
+        for entity in visible:
+            if entity.z_index in self.independent_z_indices and (
+                entity.should_render
+                and not (skip_optional and entity.optional_render)
+                and self.static_layer_of(entity) is None
+            ):
+                layers.setdefault(entity.z_index, []).append(entity)
+        if self.render_pool is None:
+            self.render_pool = ThreadPoolExecutor(
+                RenderManager.RENDER_THREADS, thread_name_prefix="render"
+            )
+        jobs: Dict[int, Tuple[Future, Rect]] = {}
+        for z_index, entities in layers.items():
+            layer_sur = self.layer_surfaces.get(z_index)
+            if layer_sur is None or layer_sur.get_size() != target.size:
+                layer_sur = Surface(target.size, pygame.SRCALPHA)
+                self.layer_surfaces[z_index] = layer_sur
+            rects = [self.bounds_of(entity) for entity in entities]
+            if all(rect.w and rect.h for rect in rects):
+                area = rects[0].unionall(rects[1:]).clip(target)
+            else:
+                area = target
+            jobs[z_index] = self.render_pool.submit(
+                RenderManager.render_layer,
+                layer_sur,
+                area,
+                entities,
+                sur.get_clip(),
+                world_clip,
+            )
+        return jobs
+
+    @staticmethod
+    def render_layer(
+        layer_sur: Surface,
+        area: Rect,
+        entities: List[Entity],
+        screen_clip: Rect,
+        world_clip: Rect = None,
+    ) -> Tuple[Surface, Rect]:
+        layer_sur.set_clip(None)
+        layer_sur.fill((0, 0, 0, 0), area)
+        for entity in entities:
+            if world_clip is None or entity.screen_space:
+                layer_sur.set_clip(screen_clip)
+            else:
+                layer_sur.set_clip(world_clip)
+            entity.render(layer_sur)
+        layer_sur.set_clip(None)
+        return layer_sur, area
+
+    def commands_of(self, entity: Entity) -> List[tuple]:
+        """
+        The draw commands entity.record() gave, with REPLAY_COMMANDS
+        recorded again only when its screen rect changed or it called
+        mark_dirty()
+        """
+        commands = RenderCommands()
+        if not (entity.REPLAY_COMMANDS and self.replay_commands):
+            entity.record(commands)
+            return commands.commands
+        rect = self.screen_rect_of(entity)
+        recorded = self.recorded.get(entity)
+        if recorded is not None and recorded[0] == rect:
+            return recorded[1].commands
+        entity.record(commands)
+        self.recorded[entity] = (rect, commands)
+        return commands.commands
+
+    @staticmethod
+    def blit_batch(sur: Surface, batch: List[Tuple[Surface, Vector2]]):
+        # pygame-ce's fblits doesn't build the list of rects blits returns
+        if hasattr(sur, "fblits"):
+            sur.fblits(batch)
+        else:
+            sur.blits(batch, False)
+
+    def render_dirty(self, sur: Surface):
+        """
+        Clear and redraw only the regions of entities whose screen rect
+        changed, that were marked with Entity.mark_dirty() or that stopped
+        rendering, old rects included. The regions are left in dirty_rects.
+        Entities must draw inside their render_bounds(), entities without a
+        size are redrawn in every region and repaint everything when they
+        change.
+        """
+        target = sur.get_rect()
+        camera = self.camera
+        if camera is not None:
+            camera.target_rect = self.view_of(sur)
+        skip_optional = self.skip_optional
+        last_rects = self._last_rects
+        marked = self._marked
+        full_redraw = self._full_redraw
+        rects: Dict[Entity, Rect] = {}
+        changed: List[Rect] = []
+        for entity in self.entityes_sorted:
+            if not entity.should_render or (skip_optional and entity.optional_render):
+                continue
+            rect = self.bounds_of(entity)
+            rects[entity] = rect
+            old_rect = last_rects.pop(entity, None)
+            if old_rect != rect or entity in marked:
+                if not (rect.w and rect.h):
+                    full_redraw = True
+                changed.append(rect)
+                if old_rect is not None:
+                    changed.append(old_rect)
+        # whatever is left stopped rendering
+        changed.extend(last_rects.values())
+        self._last_rects = rects
+        marked.clear()
+        self._full_redraw = False
+
+        if full_redraw:
+            dirty = [target]
+        else:
+            dirty = self.merge_rects(changed, target)
+        static_layers = self.static_layers
+        if static_layers and dirty:
+            self.update_static_layers(sur)
+        prev_clip = sur.get_clip()
+        for region in dirty:
+            self.clear(sur, region)
+            sur.set_clip(region)
+            drawn_layers: List[StaticLayer] = []
+            for entity, rect in rects.items():
+                if not (rect.w and rect.h) or region.colliderect(rect):
+                    if static_layers and (layer := self.static_layer_of(entity)):
+                        if layer not in drawn_layers:
+                            drawn_layers.append(layer)
+                            sur.blit(layer.surface, region, region)
+                    else:
+                        entity.render(sur)
+        sur.set_clip(prev_clip)
+        self.dirty_rects = dirty
+
+    def merge_rects(self, rects: List[Rect], bounds: Rect) -> List[Rect]:
+        """
+        Padded, clipped to bounds and with the overlapping rects merged
+        """
+        merged: List[Rect] = []
+        padding = RenderManager.DIRTY_RECT_PADDING
+        for rect in rects:
+            rect = rect.inflate(padding * 2, padding * 2).clip(bounds)
+            if not (rect.w and rect.h):
+                continue
+            i = rect.collidelist(merged)
+            while i != -1:
+                rect.union_ip(merged.pop(i))
+                i = rect.collidelist(merged)
+            merged.append(rect)
+        if len(merged) > RenderManager.MAX_DIRTY_RECTS:
+            merged = [merged[0].unionall(merged[1:])]
+        return merged
+
+    def visible_entities(self, view: Rect, world_view: Rect = None) -> List[Entity]:
+        """
+        Entities in render order, without those whose non-empty
+        transform rect doesn't intersect view (world_view for
+        entities that are not in screen space, when given), or
+        render_bounds() the render target for those that override it
+        """
+        entities = self.entityes_sorted
+        if not self.cull:
+            self.culled_count = 0
+            return entities
+        screen_view = view
+        # entities without a size always render, give them the view itself.
+        # collidelistall tests every rect in C and keeps the order
+        if world_view is None:
+            rects = [
+                rect if (rect := entity.transform.rect()).w and rect.h else view
+                for entity in entities
+            ]
+        else:
+            # screen space entities are few (UI), they are never culled here
+            rects = [
+                (
+                    rect
+                    if not entity.screen_space
+                    and (rect := entity.transform.rect()).w
+                    and rect.h
+                    else world_view
+                )
+                for entity in entities
+            ]
+            view = world_view
+        bounded = self.bounded
+        if bounded:
+            # checked against the render target after the transform rects
+            rects = [
+                view if entity in bounded else rect
+                for entity, rect in zip(entities, rects)
+            ]
+        visible = [entities[i] for i in view.collidelistall(rects)]
+        if bounded:
+            target = self.to_target_rect(screen_view)
+            visible = [
+                entity
+                for entity in visible
+                if entity not in bounded
+                or (rect := entity.render_bounds()).colliderect(target)
+                or not (rect.w and rect.h)
+            ]
+        self.culled_count = len(entities) - len(visible)
+        return visible
 
     def render_debug(self, sur: Surface):
         self.debug_info.clear()
@@ -400,7 +1903,198 @@ class RenderManager(metaclass=Singelton):
 CallbacksDict = dict[int, list[tuple[Entity, Callable[[], bool]]]]
 
 
+class InputMode(Enum):
+    Live = 0
+    # write every frame's input to InputManager().recording
+    Record = 1
+    # read the input from InputManager().recording instead of pygame
+    Replay = 2
+
+
+@dataclass(slots=True)
+class InputFrame:
+    frame: int
+    dt: float
+    mouse_pos: Tuple[int, int]
+    mods: int
+    # fixed updates that ran since the previous frame
+    fixed_steps: int
+    events: List[pygame.event.Event]
+
+
+class InputRecording:
+    """
+    Binary file of the input InputManager processed, frame by frame:
+    a header with the random seed, then per frame the frame number, dt,
+    mouse position, key mods, fixed update count and the events
+    """
+
+    MAGIC = b"PYIN"
+    VERSION = 2
+    HEADER = struct.Struct("<4sHI")
+    FRAME = struct.Struct("<IdhhHHH")
+    EVENT_TYPE = struct.Struct("<H")
+    KEY = struct.Struct("<i")
+    BUTTON = struct.Struct("<Bhh")
+    WHEEL = struct.Struct("<ff")
+    KEY_EVENTS = (pygame.KEYDOWN, pygame.KEYUP)
+    BUTTON_EVENTS = (pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP)
+    RECORDED_EVENTS = (pygame.QUIT, pygame.MOUSEWHEEL, *KEY_EVENTS, *BUTTON_EVENTS)
+
+    def __init__(self, path: str, write: bool, seed: int = 0):
+        self.path = path
+        self.write = write
+        if write:
+            self.seed = seed
+            self.file = open(path, "wb")
+            self.file.write(
+                InputRecording.HEADER.pack(
+                    InputRecording.MAGIC, InputRecording.VERSION, seed
+                )
+            )
+        else:
+            self.file = open(path, "rb")
+            header = self.file.read(InputRecording.HEADER.size)
+            magic, version, self.seed = InputRecording.HEADER.unpack(header)
+            assert (
+                magic == InputRecording.MAGIC and version == InputRecording.VERSION
+            ), f"{path} is not an input recording"
+
+    def write_frame(self, frame: InputFrame):
+        events = [e for e in frame.events if e.type in InputRecording.RECORDED_EVENTS]
+        parts = [
+            InputRecording.FRAME.pack(
+                frame.frame,
+                frame.dt,
+                *frame.mouse_pos,
+                frame.mods,
+                frame.fixed_steps,
+                len(events),
+            )
+        ]
+        for event in events:
+            parts.append(InputRecording.EVENT_TYPE.pack(event.type))
+            if event.type in InputRecording.KEY_EVENTS:
+                parts.append(InputRecording.KEY.pack(event.key))
+            elif event.type in InputRecording.BUTTON_EVENTS:
+                parts.append(InputRecording.BUTTON.pack(event.button, *event.pos))
+            elif event.type == pygame.MOUSEWHEEL:
+                parts.append(
+                    InputRecording.WHEEL.pack(event.precise_x, event.precise_y)
+                )
+        self.file.write(b"".join(parts))
+
+    def _read(self, fmt: struct.Struct) -> tuple:
+        return fmt.unpack(self.file.read(fmt.size))
+
+    def read_frame(self) -> Optional[InputFrame]:
+        """
+        The next frame, None at the end of the recording
+        """
+        data = self.file.read(InputRecording.FRAME.size)
+        if len(data) < InputRecording.FRAME.size:
+            return None
+        frame, dt, x, y, mods, fixed_steps, count = InputRecording.FRAME.unpack(data)
+        events = []
+        for _ in range(count):
+            (event_type,) = self._read(InputRecording.EVENT_TYPE)
+            if event_type in InputRecording.KEY_EVENTS:
+                (key,) = self._read(InputRecording.KEY)
+                event = pygame.event.Event(event_type, key=key)
+            elif event_type in InputRecording.BUTTON_EVENTS:
+                button, event_x, event_y = self._read(InputRecording.BUTTON)
+                event = pygame.event.Event(
+                    event_type, button=button, pos=(event_x, event_y)
+                )
+            elif event_type == pygame.MOUSEWHEEL:
+                precise_x, precise_y = self._read(InputRecording.WHEEL)
+                event = pygame.event.Event(
+                    event_type, precise_x=precise_x, precise_y=precise_y
+                )
+            else:
+                event = pygame.event.Event(event_type)
+            events.append(event)
+        return InputFrame(frame, dt, (x, y), mods, fixed_steps, events)
+
+    def close(self):
+        self.file.close()
+
+
 class InputManager(metaclass=Singelton):
+    class TargetGrid:
+        """
+        Uniform grid over the screen rects of the mouse targets
+        """
+
+        CELL_SIZE = 64
+
+        def __init__(self):
+            self.cells: Dict[Tuple[int, int], List[Entity]] = {}
+            self.rects: Dict[Entity, Rect] = {}
+            # the transform.rect() each screen rect was made from, Transform
+            # returns the same Rect until it moves
+            self.sources: Dict[Entity, Rect] = {}
+            # the camera and view_scale the screen rects were made with
+            self.view = None
+            self.valid = False
+
+        def clear(self):
+            self.cells.clear()
+            self.rects.clear()
+            self.sources.clear()
+            self.view = None
+            self.valid = False
+
+        @staticmethod
+        def _cells_of(rect: Rect):
+            size = InputManager.TargetGrid.CELL_SIZE
+            for x in range(rect.left // size, (rect.right - 1) // size + 1):
+                for y in range(rect.top // size, (rect.bottom - 1) // size + 1):
+                    yield x, y
+
+        def insert(self, entity: Entity, rect: Rect, source: Rect = None):
+            self.rects[entity] = rect
+            self.sources[entity] = source
+            cells = self.cells
+            for key in self._cells_of(rect):
+                cells.setdefault(key, []).append(entity)
+
+        def remove(self, entity: Entity):
+            rect = self.rects.pop(entity, None)
+            if rect is None:
+                return
+            del self.sources[entity]
+            cells = self.cells
+            for key in self._cells_of(rect):
+                cell = cells[key]
+                cell.remove(entity)
+                if not cell:
+                    del cells[key]
+
+        def query(self, pos: Pos) -> List[Entity]:
+            """
+            Entities whose rect contains pos, topmost first
+            """
+            size = InputManager.TargetGrid.CELL_SIZE
+            cell = self.cells.get((int(pos[0] // size), int(pos[1] // size)), ())
+            hits = [entity for entity in cell if self.rects[entity].collidepoint(pos)]
+            if len(hits) > 1:
+                # the later drawn wins a z_index tie, look up the hits only
+                entities = RenderManager().entityes_sorted
+
+                def order(entity: Entity):
+                    z_index = entity.z_index
+                    lo = bisect.bisect_left(
+                        entities, z_index, key=lambda item: item.z_index
+                    )
+                    try:
+                        return z_index, entities.index(entity, lo)
+                    except ValueError:
+                        return z_index, -1
+
+                hits.sort(key=order, reverse=True)
+            return hits
+
     def __init__(self):
         super().__init__()
         self.callbacks_key_down: CallbacksDict = {}
@@ -408,26 +2102,68 @@ class InputManager(metaclass=Singelton):
         self.callbacks_mouse_pressed: CallbacksDict = {}
         self.callbacks_mouse_released: CallbacksDict = {}
         self.callbacks_mouse_scroll: List[Tuple[Entity, Callable[[Vector2], None]]] = []
-        self.update_callbacks_entities_order = False
+        # callback lists (by id) to sort by z_index before their next dispatch
+        self.unsorted_callbacks: Dict[int, list] = {}
+        # entity -> the (callbacks, key) it registered to
+        self.entity_callbacks: Dict[Entity, List[Tuple[CallbacksDict, int]]] = {}
+        # entity -> button -> (on_pressed, on_released), clicks on the
+        # entity's transform go to the topmost target only
+        self.mouse_targets: Dict[
+            Entity, Dict[int, Tuple[Callable[[], bool], Callable[[], bool]]]
+        ] = {}
+        self.target_grid = InputManager.TargetGrid()
+        self.mode = InputMode.Live
+        self.recording: InputRecording = None
+        self.frame_number = 0
+        # the input state of the current frame, read once per update()
+        self.mouse_pos: Tuple[int, int] = (0, 0)
+        # GameManager().to_render_pos(mouse_pos), don't modify it
+        self.render_mouse_pos = Pos()
+        self.mouse_pressed: Tuple[bool, ...] = (False, False, False)
+        # pygame.key.get_pressed(), a defaultdict while replaying
+        self.keys: Union[Sequence[bool], Dict[int, bool]] = defaultdict(bool)
+        self.mods = 0
+        # fixed updates the current frame runs, while replaying
+        self.fixed_steps = 0
+        self._fixed_update_count = 0
 
-    def _update_callbacks_for(self, callbacks: CallbacksDict):
-        for val in callbacks.values():
-            val.sort(key=lambda e: e[0].z_index, reverse=True)
-        self.update_callbacks_entities_order = False
+    @staticmethod
+    def _callbacks_order(item: Tuple[Entity, Callable]):
+        return -item[0].z_index
 
-    def update_callbacks_order(self):
-        self._update_callbacks_for(self.callbacks_key_down)
-        self._update_callbacks_for(self.callbacks_key_up)
-        self._update_callbacks_for(self.callbacks_mouse_pressed)
-        self._update_callbacks_for(self.callbacks_mouse_released)
+    def update_callbacks_order(self, entity: Entity = None):
+        """
+        Sort the callback lists entity is in (all lists when None)
+        by z_index before their next dispatch
+        """
+        unsorted = self.unsorted_callbacks
+        if entity is None:
+            for callbacks in (
+                self.callbacks_key_down,
+                self.callbacks_key_up,
+                self.callbacks_mouse_pressed,
+                self.callbacks_mouse_released,
+            ):
+                for val in callbacks.values():
+                    unsorted[id(val)] = val
+            return
+        for callbacks, key in self.entity_callbacks.get(entity, ()):
+            val = callbacks.get(key)
+            if val is not None:
+                unsorted[id(val)] = val
 
     def _register_key(self, callbacks: CallbacksDict, key, entity: Entity, func):
-        if key not in callbacks:
-            callbacks[key] = []
-        callbacks[key].append((entity, func))
-        self.update_callbacks_entities_order = True
-        # idx = bisect.bisect([e.z_index for e, _ in callbacks[key]], entity.z_index)
-        # callbacks[key].insert(idx, (entity, func))
+        # a new list, a trigger may be iterating the old one
+        val = callbacks.get(key)
+        new_val = [] if val is None else val.copy()
+        if val is not None and self.unsorted_callbacks.pop(id(val), None):
+            new_val.append((entity, func))
+            self.unsorted_callbacks[id(new_val)] = new_val
+        else:
+            # keep it sorted, after the callbacks with the same z_index
+            bisect.insort_right(new_val, (entity, func), key=self._callbacks_order)
+        callbacks[key] = new_val
+        self.entity_callbacks.setdefault(entity, []).append((callbacks, key))
 
     def register_key_down(self, key, entity: Entity, func):
         self._register_key(self.callbacks_key_down, key, entity, func)
@@ -446,44 +2182,290 @@ class InputManager(metaclass=Singelton):
 
     def register_mouse_scroll(self, entity, func):
         self.callbacks_mouse_scroll.append((entity, func))
+        self.entity_callbacks.setdefault(entity, [])
+
+    def register_mouse_target(
+        self,
+        button,
+        entity: Entity,
+        on_pressed: Callable[[], bool] = None,
+        on_released: Callable[[], bool] = None,
+    ):
+        """
+        Call on_pressed / on_released when button is pressed / released over
+        entity's screen rect and entity is the topmost target there.
+        It runs in z_index order with the regular mouse callbacks, a truthy
+        return value stops the ones below it
+        """
+        self.mouse_targets.setdefault(entity, {})[button] = (on_pressed, on_released)
+        self.target_grid.valid = False
+        return self
+
+    def update_target_grid(self):
+        """
+        Move the grid rects of the targets that moved since the last update
+        """
+        grid = self.target_grid
+        render_manager = RenderManager()
+        camera = render_manager.camera
+        view = (
+            render_manager.view_scale,
+            camera,
+            None if camera is None else (Pos(camera.pos), camera.zoom),
+            None if camera is None else camera.screen_rect,
+        )
+        if view != grid.view:
+            grid.clear()
+            grid.view = view
+        sources = grid.sources
+        started = EntityState.Started
+        for entity in self.mouse_targets:
+            if entity.state is not started:
+                grid.remove(entity)
+                continue
+            rect = entity.transform.rect()
+            if sources.get(entity, None) is not rect:
+                grid.remove(entity)
+                grid.insert(entity, render_manager.screen_rect_of(entity), rect)
+        grid.valid = True
+
+    def target_at(self, pos: Pos, button) -> Optional[Entity]:
+        """
+        Topmost mouse target at pos (GameManager().to_render_pos
+        coordinates) listening to button
+        """
+        if not self.target_grid.valid:
+            self.update_target_grid()
+        # the grid has screen rects, on the render target
+        view_scale = RenderManager().view_scale
+        if view_scale != 1:
+            pos = (pos[0] * view_scale, pos[1] * view_scale)
+        for entity in self.target_grid.query(pos):
+            if button in self.mouse_targets[entity]:
+                return entity
+        return None
+
+    def _target_callback(
+        self, button, pos, released: bool
+    ) -> Optional[Tuple[int, Callable[[], bool]]]:
+        """
+        (z_index, on_pressed / on_released) of the topmost target at pos
+        """
+        if not self.mouse_targets:
+            return None
+        if pos is None:
+            pos = self.mouse_pos
+        entity = self.target_at(GameManager().to_render_pos(pos), button)
+        if entity is None:
+            return None
+        func = self.mouse_targets[entity][button][released]
+        return None if func is None else (entity.z_index, func)
+
+    def unregister(self, entity: Entity):
+        """
+        Drop all of entity's callbacks, Entity.kill() calls it
+        """
+        if self.mouse_targets.pop(entity, None) is not None:
+            self.target_grid.remove(entity)
+        registered = self.entity_callbacks.pop(entity, None)
+        if registered is None:
+            return
+        unsorted = self.unsorted_callbacks
+        # new lists, a trigger may be iterating the old ones
+        for callbacks, key in registered:
+            val = callbacks.get(key)
+            if val is None:
+                continue
+            new_val = [item for item in val if item[0] is not entity]
+            if unsorted.pop(id(val), None) is not None and new_val:
+                unsorted[id(new_val)] = new_val
+            if new_val:
+                callbacks[key] = new_val
+            else:
+                del callbacks[key]
+        self.callbacks_mouse_scroll = [
+            item for item in self.callbacks_mouse_scroll if item[0] is not entity
+        ]
 
-    def _trigger_key(callbacks: CallbacksDict, key):
-        for entity, func in callbacks.get(key, []):
-            if entity in GameManager().entities:
+    def _trigger_key(
+        self,
+        callbacks: CallbacksDict,
+        key,
+        target: Tuple[int, Callable[[], bool]] = None,
+    ):
+        """
+        target is a mouse target's (z_index, callback), it runs before
+        the callbacks of its z_index and below
+        """
+        val = callbacks.get(key, ())
+        if self.unsorted_callbacks and id(val) in self.unsorted_callbacks:
+            del self.unsorted_callbacks[id(val)]
+            val.sort(key=self._callbacks_order)
+        started = EntityState.Started
+        for entity, func in val:
+            if target is not None and entity.z_index <= target[0]:
+                if target[1]():
+                    return
+                target = None
+            # registered in __init__, not started yet
+            if entity.state is started:
                 if func():
-                    break
+                    return
+        if target is not None:
+            target[1]()
 
     def trigger_key_down(self, key):
-        InputManager._trigger_key(self.callbacks_key_down, key)
+        self._trigger_key(self.callbacks_key_down, key)
 
     def trigger_key_up(self, key):
-        InputManager._trigger_key(self.callbacks_key_up, key)
+        self._trigger_key(self.callbacks_key_up, key)
 
-    def trigger_mouse_pressed(self, button):
-        InputManager._trigger_key(self.callbacks_mouse_pressed, button)
+    def trigger_mouse_pressed(self, button, pos: Pos = None):
+        self._trigger_key(
+            self.callbacks_mouse_pressed,
+            button,
+            self._target_callback(button, pos, False),
+        )
 
-    def trigger_mouse_released(self, button):
-        InputManager._trigger_key(self.callbacks_mouse_released, button)
+    def trigger_mouse_released(self, button, pos: Pos = None):
+        self._trigger_key(
+            self.callbacks_mouse_released,
+            button,
+            self._target_callback(button, pos, True),
+        )
 
     def trigger_mouse_scroll(self, scroll):
         for entity, func in self.callbacks_mouse_scroll:
-            if entity in GameManager().entities:
+            if entity.state is EntityState.Started:
                 func(scroll)
 
     def clear(self):
         self.callbacks_key_down.clear()
         self.callbacks_key_up.clear()
         self.callbacks_mouse_pressed.clear()
+        self.callbacks_mouse_released.clear()
         self.callbacks_mouse_scroll.clear()
+        self.unsorted_callbacks.clear()
+        self.entity_callbacks.clear()
+        self.mouse_targets.clear()
+        self.target_grid.clear()
         return self
 
+    def record(self, path: str, seed: int = None):
+        """
+        Write the input of every following frame to path and seed random
+        with seed, call it before building the scene
+        """
+        self.stop()
+        if seed is None:
+            seed = time.time_ns() & 0xFFFFFFFF
+        random.seed(seed)
+        self.recording = InputRecording(path, write=True, seed=seed)
+        self.mode = InputMode.Record
+        self.frame_number = 0
+        self._fixed_update_count = UpdateManager().fixed_update_count
+
+    def replay(self, path: str):
+        """
+        Feed the input recorded to path back, frame by frame, with the
+        recorded dt and fixed update steps. Call it before building the
+        scene (it seeds random), update() returns True when it's over
+        """
+        self.stop()
+        self.recording = InputRecording(path, write=False)
+        random.seed(self.recording.seed)
+        self.mode = InputMode.Replay
+        self.frame_number = 0
+        self.keys = defaultdict(bool)
+        self.mouse_pressed = (False, False, False)
+
+    def stop(self):
+        """
+        Stop recording or replaying
+        """
+        if self.recording is not None:
+            self.recording.close()
+            self.recording = None
+        self.mode = InputMode.Live
+
+    def is_down(self, key) -> bool:
+        """
+        Whether key is held this frame
+        """
+        return self.keys[key]
+
+    def is_mouse_down(self, button=pygame.BUTTON_LEFT) -> bool:
+        """
+        Whether the mouse button is held this frame
+        """
+        return button <= len(self.mouse_pressed) and self.mouse_pressed[button - 1]
+
+    def _replay_state(self, events: List[pygame.event.Event]):
+        # the recording has the events only, follow them
+        mouse_pressed = list(self.mouse_pressed)
+        for event in events:
+            if event.type == pygame.KEYDOWN or event.type == pygame.KEYUP:
+                self.keys[event.key] = event.type == pygame.KEYDOWN
+            elif event.type in InputRecording.BUTTON_EVENTS:
+                if event.button <= len(mouse_pressed):
+                    mouse_pressed[event.button - 1] = (
+                        event.type == pygame.MOUSEBUTTONDOWN
+                    )
+        self.mouse_pressed = tuple(mouse_pressed)
+
+    def poll_events(self) -> Optional[List[pygame.event.Event]]:
+        """
+        This frame's events, from pygame or the replayed recording
+        (None at its end), the frame's input state is set too
+        """
+        if self.mode is InputMode.Replay:
+            # keep the window responsive, its input is ignored
+            pygame.event.pump()
+            frame = self.recording.read_frame()
+            if frame is None:
+                self.stop()
+                return None
+            self.mouse_pos = frame.mouse_pos
+            self.render_mouse_pos = GameManager().to_render_pos(self.mouse_pos)
+            self.mods = frame.mods
+            self._replay_state(frame.events)
+            self.fixed_steps = frame.fixed_steps
+            GameManager().dt = frame.dt
+            self.frame_number += 1
+            return frame.events
+
+        events = pygame.event.get()
+        self.mouse_pos = pygame.mouse.get_pos()
+        self.render_mouse_pos = GameManager().to_render_pos(self.mouse_pos)
+        self.mouse_pressed = pygame.mouse.get_pressed()
+        self.keys = pygame.key.get_pressed()
+        self.mods = pygame.key.get_mods()
+        if self.mode is InputMode.Record:
+            fixed_update_count = UpdateManager().fixed_update_count
+            self.recording.write_frame(
+                InputFrame(
+                    self.frame_number,
+                    GameManager().dt,
+                    self.mouse_pos,
+                    self.mods,
+                    fixed_update_count - self._fixed_update_count,
+                    events,
+                )
+            )
+            self._fixed_update_count = fixed_update_count
+        self.frame_number += 1
+        return events
+
     def update(self):
         """
         returns True if got a quit event
         """
-        if self.update_callbacks_entities_order:
-            self.update_callbacks_order()
-        for event in pygame.event.get():
+        # targets may have moved since the last frame
+        self.target_grid.valid = False
+        events = self.poll_events()
+        if events is None:
+            return True
+        for event in events:
             if event.type == pygame.QUIT:
                 return True
             elif event.type == pygame.KEYDOWN:
@@ -491,14 +2473,14 @@ class InputManager(metaclass=Singelton):
 
             elif event.type == pygame.KEYUP:
                 self.trigger_key_up(event.key)
-                if GameManager().debug and pygame.key.get_mods() & pygame.KMOD_CTRL:
+                if GameManager().debug and self.mods & pygame.KMOD_CTRL:
                     GameManager().on_ctrl_d()
 
             elif event.type == pygame.MOUSEBUTTONDOWN:
-                self.trigger_mouse_pressed(event.button)
+                self.trigger_mouse_pressed(event.button, event.pos)
 
             elif event.type == pygame.MOUSEBUTTONUP:
-                self.trigger_mouse_released(event.button)
+                self.trigger_mouse_released(event.button, event.pos)
 
             elif event.type == pygame.MOUSEWHEEL:
                 self.trigger_mouse_scroll(Vector2(event.precise_x, event.precise_y))
@@ -562,24 +2544,455 @@ class ColliderManager(metaclass=Singelton):
                                 ](entity, other_entity)
 
 
+@dataclass(slots=True)
+class DegradationHook:
+    priority: int  # lower priority degrades first
+    degrade: Callable[[], None]
+    restore: Callable[[], None] = None
+    name: str = ""
+
+
+class FrameBudgetManager(metaclass=Singelton):
+    """
+    Measures every phase of the frame against 1 / GameManager().fps.
+
+    When the budget is exceeded for OVER_BUDGET_FRAMES frames in a row,
+    the next registered degradation hook (by priority) is applied.
+    After RECOVERY_FRAMES frames under RECOVERY_HEADROOM of the budget,
+    the last applied hook is restored.
+    """
+
+    PHASES = ("input", "update", "lifecycle", "collision", "render")
+    OVER_BUDGET_FRAMES = 3
+    RECOVERY_FRAMES = 120
+    RECOVERY_HEADROOM = 0.5
+
+    def __init__(self):
+        self.hooks: List[DegradationHook] = []
+        self.phase_times: Dict[str, int] = dict.fromkeys(FrameBudgetManager.PHASES, 0)
+        self.last_phase_times: Dict[str, int] = dict(self.phase_times)
+        # times recorded by other threads (the fixed update Timer),
+        # end_frame adds them to the frame it ends
+        self._threaded_times: Dict[str, int] = {}
+        self._lock = Lock()
+        self.over_budget_phase: str = None
+        self.level = 0  # number of currently applied hooks
+        self._over_budget_count = 0
+        self._under_budget_count = 0
+
+    def register(self, hook: DegradationHook):
+        bisect.insort_right(self.hooks, hook, key=lambda item: item.priority)
+        return self
+
+    def unregister(self, hook: DegradationHook):
+        index = self.hooks.index(hook)
+        if index < self.level:
+            self.restore_all()
+        self.hooks.remove(hook)
+
+    def register_default_hooks(self):
+        """
+        skip optional renders, drop debug collection, halve update rates
+        """
+
+        def set_skip_optional(value):
+            RenderManager().skip_optional = value
+
+        def set_collect_debug_info(value):
+            GameManager().collect_debug_info = value
+
+        def scale_fixed_dt(factor):
+            UpdateManager.FIXED_DT *= factor
+
+        return (
+            self.register(
+                DegradationHook(
+                    0,
+                    lambda: set_skip_optional(True),
+                    lambda: set_skip_optional(False),
+                    "skip optional renders",
+                )
+            )
+            .register(
+                DegradationHook(
+                    1,
+                    lambda: set_collect_debug_info(False),
+                    lambda: set_collect_debug_info(True),
+                    "drop debug collection",
+                )
+            )
+            .register(
+                DegradationHook(
+                    2,
+                    lambda: scale_fixed_dt(2),
+                    lambda: scale_fixed_dt(0.5),
+                    "halve update rates",
+                )
+            )
+        )
+
+    def record(self, phase: str, start_ns: int) -> int:
+        """
+        Add the time since start_ns to phase and return the current time
+        so consecutive phases can be chained.
+        """
+        now = time.perf_counter_ns()
+        self.phase_times[phase] += now - start_ns
+        return now
+
+    def record_threaded(self, phase: str, start_ns: int) -> int:
+        """
+        record() for threads other than the one running the frame
+        """
+        now = time.perf_counter_ns()
+        with self._lock:
+            threaded_times = self._threaded_times
+            threaded_times[phase] = threaded_times.get(phase, 0) + now - start_ns
+        return now
+
+    def end_frame(self, fps: float):
+        budget_ns = 1_000_000_000 / fps if fps else 0
+        with self._lock:
+            threaded_times = self._threaded_times
+            self._threaded_times = {}
+        for phase, ns in threaded_times.items():
+            self.phase_times[phase] += ns
+        total_ns = sum(self.phase_times.values())
+        self.last_phase_times = self.phase_times
+        self.phase_times = dict.fromkeys(FrameBudgetManager.PHASES, 0)
+        if budget_ns and total_ns > budget_ns:
+            self.over_budget_phase = max(
+                self.last_phase_times, key=self.last_phase_times.get
+            )
+            self._under_budget_count = 0
+            self._over_budget_count += 1
+            if self._over_budget_count >= FrameBudgetManager.OVER_BUDGET_FRAMES:
+                self._over_budget_count = 0
+                self.degrade()
+        else:
+            self.over_budget_phase = None
+            self._over_budget_count = 0
+            if total_ns < budget_ns * FrameBudgetManager.RECOVERY_HEADROOM:
+                self._under_budget_count += 1
+                if self._under_budget_count >= FrameBudgetManager.RECOVERY_FRAMES:
+                    self._under_budget_count = 0
+                    self.restore()
+            else:
+                self._under_budget_count = 0
+
+    def degrade(self):
+        if self.level < len(self.hooks):
+            self.hooks[self.level].degrade()
+            self.level += 1
+            return True
+        return False
+
+    def restore(self):
+        if self.level > 0:
+            self.level -= 1
+            hook = self.hooks[self.level]
+            if hook.restore:
+                hook.restore()
+            return True
+        return False
+
+    def restore_all(self):
+        while self.restore():
+            pass
+
+    def clear(self):
+        self.restore_all()
+        self.hooks.clear()
+        self.phase_times = dict.fromkeys(FrameBudgetManager.PHASES, 0)
+        with self._lock:
+            self._threaded_times = {}
+        self.over_budget_phase = None
+        self._over_budget_count = 0
+        self._under_budget_count = 0
+        return self
+
+
 class EmptyEntity(Entity):
     def render(self, sur: Surface):
-        sur.fill(Color("Yellow"))
+        # fills its screen rect, or the whole surface while it has no size
+        rect = self.screen_rect()
+        sur.fill(Color("Yellow"), rect if rect.w and rect.h else None)
 
 T = TypeVar('T')
 
-@dataclass
+@dataclass(slots=True)
 class BarData:
     xs: List[str]
     ys: List[float]
 
 
+class ScaleMode(Enum):
+    Nearest = 0
+    # the largest whole factor that fits, centered (pixel perfect)
+    Integer = 1
+    Smooth = 2
+
+
+class TextCache(metaclass=Singelton):
+    """
+    LRU cache of rendered text surfaces, keyed by
+    (font, text, antialias, color, background).
+    The surfaces are shared, don't draw on them.
+    """
+
+    MAX_SIZE = 512
+
+    def __init__(self):
+        self.surfaces: OrderedDict[tuple, Surface] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        # independent layers render texts from several threads
+        self._lock = Lock()
+
+    def render(
+        self,
+        font: pygame.font.Font,
+        text: str,
+        antialias: bool,
+        color,
+        background=None,
+    ) -> Surface:
+        key = (
+            font,
+            text,
+            antialias,
+            color if type(color) is tuple else tuple(Color(color)),
+            (
+                background
+                if background is None or type(background) is tuple
+                else tuple(Color(background))
+            ),
+        )
+        surfaces = self.surfaces
+        # held across the miss too, the fonts are shared and
+        # a Font must not render on two threads at once
+        with self._lock:
+            sur = surfaces.get(key)
+            if sur is not None:
+                self.hits += 1
+                surfaces.move_to_end(key)
+                return sur
+            self.misses += 1
+            sur = pygame.font.Font.render(font, text, antialias, color, background)
+            surfaces[key] = sur
+            if len(surfaces) > TextCache.MAX_SIZE:
+                surfaces.popitem(last=False)
+        return sur
+
+    def forget(self, font: pygame.font.Font):
+        with self._lock:
+            for key in [key for key in self.surfaces if key[0] is font]:
+                del self.surfaces[key]
+
+    def clear(self):
+        with self._lock:
+            self.surfaces.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+class CachedFont(pygame.font.Font):
+    """
+    pygame.font.Font whose render() goes through TextCache()
+    """
+
+    def render(self, text, antialias, color, bgcolor=None) -> Surface:
+        return TextCache().render(self, text, antialias, color, bgcolor)
+
+
+class AssetManager(metaclass=Singelton):
+    """
+    Loads images, fonts and sounds once and shares them.
+    Every load adds a reference, release() removes one and the
+    asset is dropped when nobody references it anymore.
+    Images are convert()ed (convert_alpha() when they have per pixel
+    alpha) to the display format once a display mode is set.
+    """
+
+    def __init__(self):
+        self.assets: Dict[tuple, object] = {}
+        self.refcounts: Dict[tuple, int] = {}
+        # id(asset) -> key, to release by the asset itself
+        self._keys: Dict[int, tuple] = {}
+
+    def _acquire(self, key: tuple, load: Callable[[], object]):
+        asset = self.assets.get(key)
+        if asset is None:
+            asset = load()
+            self.assets[key] = asset
+            self.refcounts[key] = 0
+            self._keys[id(asset)] = key
+        self.refcounts[key] += 1
+        return asset
+
+    def image(self, path: str) -> Surface:
+        return self._acquire(("image", path), lambda: self.load_image(path))
+
+    @staticmethod
+    def load_image(path: str) -> Surface:
+        image = pygame.image.load(path)
+        if pygame.display.get_surface() is None:
+            return image
+        if image.get_flags() & pygame.SRCALPHA:
+            return image.convert_alpha()
+        return image.convert()
+
+    def font(
+        self, name: str | None, size: int, replacing: CachedFont = None
+    ) -> CachedFont:
+        """
+        name is a font file, None for pygame's default font.
+        replacing is released after the new font is acquired, so asking
+        again for the same face and size constructs nothing.
+        """
+        if not pygame.font.get_init():
+            pygame.font.init()
+        font = self._acquire(("font", name, size), lambda: CachedFont(name, size))
+        if replacing is not None:
+            self.release(replacing)
+        return font
+
+    def sound(self, path: str) -> pygame.mixer.Sound:
+        if not pygame.mixer.get_init():
+            pygame.mixer.init()
+        return self._acquire(("sound", path), lambda: pygame.mixer.Sound(path))
+
+    def release(self, asset):
+        key = self._keys.get(id(asset))
+        assert key is not None, "asset wasn't loaded by AssetManager"
+        self.refcounts[key] -= 1
+        if self.refcounts[key] == 0:
+            del self.assets[key]
+            del self.refcounts[key]
+            del self._keys[id(asset)]
+            if key[0] == "font":
+                # its rendered texts are useless now
+                TextCache().forget(asset)
+
+    def clear(self):
+        self.assets.clear()
+        self.refcounts.clear()
+        self._keys.clear()
+
+
+class RecordFormat(Enum):
+    # frame_000000.png, frame_000001.png, ... in the directory
+    Png = 0
+    # one frames_<w>x<h>.rgb file, w * h * 3 bytes per frame
+    Raw = 1
+
+
+class RecordPolicy(Enum):
+    """
+    What FrameRecorder.capture does when the buffer is full
+    """
+
+    DropNewest = 0
+    DropOldest = 1
+    # wait for the writer (slows the game loop down)
+    Block = 2
+
+
+class FrameRecorder:
+    """
+    Copies frames into a bounded buffer, a writer thread encodes
+    them to the directory at path. Set GameManager().recorder to
+    record every frame GameManager().render draws.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        format: RecordFormat = RecordFormat.Png,
+        capacity: int = 120,
+        policy: RecordPolicy = RecordPolicy.DropNewest,
+    ):
+        self.path = path
+        self.format = format
+        self.policy = policy
+        self.frames: queue.Queue[Surface | None] = queue.Queue(capacity)
+        self.dropped = 0
+        self.written = 0
+        self._writer: Thread = None
+
+    def start(self):
+        os.makedirs(self.path, exist_ok=True)
+        self._writer = Thread(
+            target=self._write_frames, name="frame recorder", daemon=True
+        )
+        self._writer.start()
+
+    @property
+    def running(self) -> bool:
+        return self._writer is not None and self._writer.is_alive()
+
+    def capture(self, sur: Surface):
+        frame = sur.copy()
+        # with no writer to wait for, Block drops like DropNewest
+        if self.policy == RecordPolicy.Block and self._put(frame):
+            return
+        try:
+            self.frames.put_nowait(frame)
+        except queue.Full:
+            self.dropped += 1
+            if self.policy == RecordPolicy.DropOldest:
+                try:
+                    self.frames.get_nowait()
+                    self.frames.put_nowait(frame)
+                except (queue.Empty, queue.Full):
+                    pass
+
+    def stop(self):
+        """
+        Write the buffered frames and wait for the writer
+        """
+        if self._writer is None:
+            return
+        self._put(None)
+        self._writer.join()
+        self._writer = None
+
+    def _put(self, item: Surface | None) -> bool:
+        """
+        Wait for room in the buffer while the writer is running
+        """
+        while self.running:
+            try:
+                self.frames.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def _write_frames(self):
+        raw_file = None
+        while (frame := self.frames.get()) is not None:
+            if self.format == RecordFormat.Png:
+                pygame.image.save(
+                    frame, os.path.join(self.path, f"frame_{self.written:06}.png")
+                )
+            else:
+                if raw_file is None:
+                    w, h = frame.get_size()
+                    raw_path = os.path.join(self.path, f"frames_{w}x{h}.rgb")
+                    raw_file = open(raw_path, "wb")
+                raw_file.write(pygame.image.tobytes(frame, "RGB"))
+            self.written += 1
+        if raw_file is not None:
+            raw_file.close()
+
+
 class GameManager(metaclass=Singelton):
     DEBUG_INFO_DISPLAY_W = 500
     DEBUG_INFO_DISPLAY_H = 500
     multiprocessing_method_was_set = False
 
-    @dataclass
+    @dataclass(slots=True)
     class DebugInfoElement:
         update_info: BarData
         render_info: BarData
@@ -599,10 +3012,27 @@ class GameManager(metaclass=Singelton):
         self.to_add: list[Entity] = []
         if not pygame.font.get_init():
             pygame.font.init()
-        self.font = pygame.font.Font(size=20)
+        self.font = CachedFont(size=20)
         self.debug = False
+        self.collect_debug_info = True
         self.debug_info_process: multiprocessing.Process = None
         self.debug_info_queue = multiprocessing.Queue(10)
+        # render into an internal surface, render_scale times the display
+        # size or a fixed render_size, scaled to the display once per frame.
+        # with render_scale entities must draw through screen_rect() /
+        # screen_pos() (or RenderManager().view_scale), ones that draw at
+        # transform.pos / transform.rect() end up off the smaller target
+        self.render_scale = 1.0
+        self.render_size: Size = None
+        self.scale_mode = ScaleMode.Nearest
+        self.render_target: Surface = None
+        # where render_target lands on the display
+        self.render_target_rect: Rect = None
+        # no window, see init_headless()
+        self.headless = False
+        # the surface of the last rendered frame
+        self.frame: Surface = None
+        self.recorder: FrameRecorder = None
 
     @overload
     def instatiate(self, __entity: T) -> T: ...
@@ -638,11 +3068,18 @@ class GameManager(metaclass=Singelton):
         self.destroy(*entities)
 
     def update(self):
+        budget = FrameBudgetManager()
+        start = time.perf_counter_ns()
         should_quit = InputManager().update()
+        start = budget.record("input", start)
 
         self.should_exit |= should_quit
 
+        if InputManager().mode is InputMode.Replay:
+            for _ in range(InputManager().fixed_steps):
+                UpdateManager().fixed_update()
         UpdateManager().update(self.dt)
+        start = budget.record("update", start)
 
         for entity in self.to_destroy:
             if entity in self.entities:
@@ -655,8 +3092,9 @@ class GameManager(metaclass=Singelton):
                 entity.start()  # self.to_add may expand here and it's fine
 
         self.to_add.clear()
+        budget.record("lifecycle", start)
 
-        if self.debug:
+        if self.debug and self.collect_debug_info:
             debug_info_element = GameManager.DebugInfoElement(
                 update_info=BarData(
                     xs=[type(e).__name__ for e in UpdateManager().debug_info.keys()],
@@ -680,10 +3118,125 @@ class GameManager(metaclass=Singelton):
             self.debug_info_process.join()
 
     def render(self, sur: Surface):
-        RenderManager().render(sur)
-        self.dt = self.clock.tick(self.fps) / 1000.0
+        budget = FrameBudgetManager()
+        start = time.perf_counter_ns()
+        self.frame = sur
+        target = self.get_render_target(sur)
+        if target is not sur and not RenderManager().dirty_rects_mode:
+            # what was drawn on sur before is covered by the scaled target
+            RenderManager().clear(target, target.get_rect())
+        RenderManager().render(target)
         if self.debug:
-            self.render_debug(sur)
+            self.render_debug(target)
+        if target is not sur:
+            self.scale_render_target(sur)
+        if self.recorder is not None:
+            self.recorder.capture(sur)
+        budget.record("render", start)
+        budget.end_frame(self.fps)
+        if InputManager().mode is InputMode.Replay:
+            # dt comes from the recording, run as fast as possible
+            self.clock.tick()
+        else:
+            self.dt = self.clock.tick(self.fps) / 1000.0
+
+    def init_headless(self, size: Size) -> Surface:
+        """
+        Run without a window: SDL's dummy video driver (the event queue
+        and the mouse still work) and an offscreen surface to render to,
+        which is returned. present() doesn't flip.
+        """
+        if pygame.display.get_init() and pygame.display.get_driver() != "dummy":
+            pygame.display.quit()
+        os.environ["SDL_VIDEODRIVER"] = "dummy"
+        pygame.display.init()
+        self.headless = True
+        self.frame = Surface(size, 0, 32)
+        return self.frame
+
+    def capture_frame(self, copy: bool = False) -> "np.ndarray":
+        """
+        The last rendered frame as a (w, h, 3) uint8 array.
+        Without copy it's a view of the surface pixels, which keeps the
+        surface locked: drop it before rendering the next frame.
+        """
+        if np is None:
+            raise ImportError("capture_frame requires numpy")
+        assert self.frame is not None, "no frame was rendered yet"
+        if copy:
+            return pygame.surfarray.array3d(self.frame)
+        return pygame.surfarray.pixels3d(self.frame)
+
+    def get_render_target(self, sur: Surface) -> Surface:
+        """
+        The surface entities render to, sur itself unless
+        render_scale or render_size are set
+        """
+        if self.render_size is None and self.render_scale == 1:
+            self.render_target = None
+            self.render_target_rect = None
+            RenderManager().set_view_scale(1.0)
+            return sur
+        if self.render_size is None:
+            size = Size(sur.get_size()) * self.render_scale
+            # entities keep laying out in display coordinates
+            RenderManager().set_view_scale(self.render_scale)
+        else:
+            # entities lay out in render_size coordinates
+            size = Size(self.render_size)
+            RenderManager().set_view_scale(1.0)
+        size = (max(int(size.x), 1), max(int(size.y), 1))
+        if self.render_target is None or self.render_target.get_size() != size:
+            self.render_target = Surface(size, 0, sur)
+            RenderManager().invalidate()
+        return self.render_target
+
+    def scale_render_target(self, sur: Surface):
+        target = self.render_target
+        rect = sur.get_rect()
+        if self.scale_mode == ScaleMode.Integer:
+            w, h = target.get_size()
+            factor = min(rect.w // w, rect.h // h)
+            if factor:
+                rect = Rect(0, 0, w * factor, h * factor)
+                rect.center = sur.get_rect().center
+                sur.fill(Color("Black"))
+        self.render_target_rect = rect
+        dest = sur if rect == sur.get_rect() else sur.subsurface(rect)
+        if self.scale_mode == ScaleMode.Smooth:
+            pygame.transform.smoothscale(target, rect.size, dest)
+        else:
+            pygame.transform.scale(target, rect.size, dest)
+
+    def to_render_pos(self, pos: Pos) -> Pos:
+        """
+        Display coordinates (e.g. pygame.mouse.get_pos()) in the
+        coordinates entities lay out in: the display's with render_scale,
+        render_size's with render_size
+        """
+        if self.render_target is None or self.render_target_rect is None:
+            return Pos(pos)
+        rect = self.render_target_rect
+        scale = RenderManager().view_scale
+        return Pos(
+            (pos[0] - rect.x) * self.render_target.get_width() / rect.w / scale,
+            (pos[1] - rect.y) * self.render_target.get_height() / rect.h / scale,
+        )
+
+    def present(self):
+        """
+        Show the rendered frame, only the regions that changed
+        in RenderManager().dirty_rects_mode (the scaled render_target
+        is always shown whole)
+        """
+        if self.headless:
+            return
+        render_manager = RenderManager()
+        if render_manager.dirty_rects_mode and self.render_target is None:
+            if render_manager.dirty_rects:
+                pygame.display.update(render_manager.dirty_rects)
+        else:
+            pygame.display.flip()
 
     def render_debug(self, sur: Surface):
         for entity in self.entities:
@@ -705,6 +3258,15 @@ class GameManager(metaclass=Singelton):
             + Vector2Left() * horz_pad
             + Vector2Left() * entities_count_sur.get_width(),
         )
+        over_budget_phase = FrameBudgetManager().over_budget_phase
+        if over_budget_phase:
+            over_budget_sur = self.font.render(over_budget_phase, False, Color("Red"))
+            sur.blit(
+                over_budget_sur,
+                Vector2(sur.get_rect().topright)
+                + Vector2Left() * over_budget_sur.get_width()
+                + Vector2Down() * fps_sur.get_height(),
+            )
 
     def on_ctrl_d(self):
         if self.debug_info_process is None or not self.debug_info_process.is_alive():
@@ -744,6 +3306,8 @@ class GameManager(metaclass=Singelton):
         while not GameManager().should_exit:
             barplot_size.w = display.get_width()
             barplot_size.h = display.get_height() / 2
+            update_debug_barplot.transform.size = barplot_size
+            render_debug_barplot.transform.size = barplot_size
             render_debug_barplot.transform.pos.y = display.get_height() / 2
             display.fill(bg)
             try:
@@ -765,7 +3329,7 @@ class GameManager(metaclass=Singelton):
 class UiButton(Entity):
     UI_DEFAULT_Z_INDEX = 100
 
-    @dataclass
+    @dataclass(slots=True)
     class RenderData:
         color: Color
         color_hover: Color
@@ -778,20 +3342,14 @@ class UiButton(Entity):
             Color("White"), Color("Blue"), GameManager().font
         )
         self.z_index = UiButton.UI_DEFAULT_Z_INDEX
+        self.screen_space = True
         self.hovered = False
         self.pressed = False
 
     def start(self):
         super().start()
-        InputManager().register_mouse_pressed(
-            pygame.BUTTON_LEFT,
-            self,
-            lambda: self.on_left_click() if self.check_hover() else None,
-        )
-        InputManager().register_mouse_released(
-            pygame.BUTTON_LEFT,
-            self,
-            lambda: self.on_mouse_released() if self.check_hover() else None,
+        InputManager().register_mouse_target(
+            pygame.BUTTON_LEFT, self, self.on_left_click, self.on_mouse_released
         )
 
     def on_hover(self):
@@ -801,8 +3359,7 @@ class UiButton(Entity):
         pass
 
     def check_hover(self) -> bool:
-        mouse_pos = pygame.mouse.get_pos()
-        return self.transform.rect().collidepoint(mouse_pos)
+        return self.transform.rect().collidepoint(InputManager().render_mouse_pos)
 
     def on_left_click(self):
         self.pressed = True
@@ -813,10 +3370,13 @@ class UiButton(Entity):
     def update(self, dt):
         super().update(dt)
         if self.check_hover():
+            if not self.hovered:
+                self.mark_dirty()
             self.hovered = True
             self.on_hover()
         elif self.hovered == True:
             self.hovered = False
+            self.mark_dirty()
             self.on_hover_out()
 
     def get_text_sur(self):
@@ -827,13 +3387,17 @@ class UiButton(Entity):
 
     def render_text(self, sur: Surface):
         text_sur = self.get_text_sur()
-        sur.blit(text_sur, self.transform.center - Size(text_sur.get_size()) / 2)
+        view_scale = RenderManager().view_scale
+        if view_scale != 1:
+            text_sur = pygame.transform.scale_by(text_sur, view_scale)
+        text_rect = text_sur.get_rect(center=self.screen_rect().center)
+        sur.blit(text_sur, text_rect)
 
     def render(self, sur: Surface):
         color = self.render_data.color
         if self.check_hover():
             color = self.render_data.color_hover
-        pygame.draw.rect(sur, color, self.transform.rect())
+        pygame.draw.rect(sur, color, self.screen_rect())
         self.render_text(sur)
 
 
@@ -924,6 +3488,8 @@ class Animation(Entity):
 
 
 class SingeltonEntity(Entity, metaclass=Singelton):
+    KEEP_INPUT_CALLBACKS = True
+
     def __init__(self):
         super().__init__()
         GameManager().instatiate(self)
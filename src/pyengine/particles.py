@@ -0,0 +1,172 @@
+import pygame
+from pygame import Color
+from .core import *
+
+
+class ParticleSystem(Entity):
+    """
+    Thousands of particles in one entity.
+
+    Position, velocity, life and color of every particle are kept in
+    numpy arrays. emit() spawns particles in bulk around the transform
+    position, update() integrates and expires them in bulk, and render()
+    maps them through RenderManager().camera and stamps all of them into
+    the surface clip with one vectorized write. render_bounds() covers
+    the live particles, for culling and dirty rects.
+    Requires numpy.
+    """
+
+    DEFAULT_CAPACITY = 10_000
+
+    def __init__(
+        self,
+        pos: Pos = None,
+        radius: float = 2,
+        gravity: Vector2 = None,
+        fade: bool = True,
+        capacity: int = DEFAULT_CAPACITY,
+    ):
+        super().__init__()
+        if np is None:
+            raise ImportError("ParticleSystem requires numpy")
+        if pos is not None:
+            self.transform.pos = pos
+        self.gravity = Vector2() if gravity is None else gravity
+        self.fade = fade
+        self.capacity = capacity
+        self.count = 0
+        self.pos = np.zeros((capacity, 2))
+        self.vel = np.zeros((capacity, 2))
+        self.life = np.zeros(capacity)
+        self.max_life = np.ones(capacity)
+        self.color = np.zeros((capacity, 3), dtype=np.uint8)
+        self.radius = radius
+        self._rng = np.random.default_rng()
+
+    @property
+    def radius(self):
+        return self._radius
+
+    @radius.setter
+    def radius(self, radius: float):
+        self._radius = radius
+        r = int(radius)
+        ys, xs = np.mgrid[-r : r + 1, -r : r + 1]
+        inside = xs * xs + ys * ys <= radius * radius
+        self._stamp = np.stack((xs[inside], ys[inside]), axis=1)
+
+    def emit(
+        self,
+        count: int,
+        speed: Tuple[float, float] = (50, 100),
+        angle_deg: Tuple[float, float] = (0, 360),
+        life: Tuple[float, float] = (0.5, 1),
+        color: Color = Color("White"),
+        spread: float = 0,
+    ):
+        """
+        Spawn up to count particles (as many as capacity allows)
+        at the transform position
+        """
+        count = min(count, self.capacity - self.count)
+        if count <= 0:
+            return 0
+        new = slice(self.count, self.count + count)
+        angles = np.radians(self._rng.uniform(*angle_deg, count))
+        speeds = self._rng.uniform(*speed, count)
+        self.pos[new] = self.transform.pos
+        if spread:
+            self.pos[new] += self._rng.uniform(-spread, spread, (count, 2))
+        self.vel[new, 0] = np.cos(angles) * speeds
+        self.vel[new, 1] = np.sin(angles) * speeds
+        self.life[new] = self._rng.uniform(*life, count)
+        self.max_life[new] = self.life[new]
+        self.color[new] = (color.r, color.g, color.b)
+        self.count += count
+        return count
+
+    def clear(self):
+        self.count = 0
+
+    def update(self, dt):
+        super().update(dt)
+        count = self.count
+        if count == 0:
+            return
+        vel = self.vel[:count]
+        if self.gravity:
+            vel += self.gravity * dt
+        self.pos[:count] += vel * dt
+        self.life[:count] -= dt
+        alive = self.life[:count] > 0
+        alive_count = int(np.count_nonzero(alive))
+        if alive_count != count:
+            for array in (self.pos, self.vel, self.life, self.max_life, self.color):
+                array[:alive_count] = array[:count][alive]
+            self.count = alive_count
+        # the particles fade even when they don't move
+        self.mark_dirty()
+
+    def screen_positions(self):
+        """
+        Particle positions on the screen, the way screen_pos() maps
+        transform.pos
+        """
+        render_manager = RenderManager()
+        camera = render_manager.camera
+        pos = self.pos[: self.count]
+        if camera is not None and not self.screen_space:
+            pos = (pos - tuple(camera.pos)) * camera.zoom + camera.screen_rect.center
+        if render_manager.view_scale != 1:
+            pos = pos * render_manager.view_scale
+        return pos
+
+    def render_bounds(self) -> Rect:
+        if self.count == 0:
+            # a zero sized rect would repaint the whole screen in dirty rects mode
+            return Rect(self.screen_pos(), (1, 1))
+        pos = np.floor(self.screen_positions())
+        r = int(self._radius)
+        left, top = pos.min(axis=0) - r
+        right, bottom = pos.max(axis=0) + r + 1
+        return Rect(int(left), int(top), int(right - left), int(bottom - top))
+
+    def render(self, sur: Surface):
+        count = self.count
+        if count == 0:
+            return
+        colors = self.color[:count]
+        alpha = None
+        if sur.get_flags() & pygame.SRCALPHA:
+            # layer surfaces: fade out through the alpha channel
+            if self.fade:
+                alpha = (self.life[:count] / self.max_life[:count] * 255).astype(
+                    np.uint8
+                )
+            else:
+                alpha = np.full(count, 255, dtype=np.uint8)
+        elif self.fade:
+            colors = (
+                colors * (self.life[:count] / self.max_life[:count])[:, None]
+            ).astype(np.uint8)
+        pos = np.floor(self.screen_positions()).astype(np.intp)
+        points = (pos[:, None, :] + self._stamp[None, :, :]).reshape(-1, 2)
+        colors = np.repeat(colors, len(self._stamp), axis=0)
+        # surfarray writes ignore the clip, which holds the camera viewport
+        clip = sur.get_clip()
+        inside = (
+            (points[:, 0] >= clip.left)
+            & (points[:, 0] < clip.right)
+            & (points[:, 1] >= clip.top)
+            & (points[:, 1] < clip.bottom)
+        )
+        xs = points[inside, 0]
+        ys = points[inside, 1]
+        pixels = pygame.surfarray.pixels3d(sur)
+        pixels[xs, ys] = colors[inside]
+        del pixels  # unlock the surface
+        if alpha is not None:
+            # pixels3d leaves the alpha channel alone
+            pixels = pygame.surfarray.pixels_alpha(sur)
+            pixels[xs, ys] = np.repeat(alpha, len(self._stamp))[inside]
+            del pixels
@@ -1,20 +1,55 @@
+import copy
+import gc
+import os
+import pickle
+import tempfile
+import threading
 import unittest
+import weakref
 from unittest.mock import Mock, patch
 import pygame
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
 from pyengine import (
     Entity,
+    SlottedEntity,
+    Sprite,
+    RenderCommands,
     EntityState,
     GameManager,
     UpdateManager,
     RenderManager,
+    Camera,
+    ScaleMode,
+    TextCache,
+    CachedFont,
+    FrameRecorder,
+    RecordFormat,
+    RecordPolicy,
+    AssetManager,
     InputManager,
+    InputMode,
     ColliderManager,
     UiButton,
     Animation,
     AnimationType,
     CollideEntity,
+    FrameBudgetManager,
+    DegradationHook,
+    Transform,
+    PooledTransform,
+    TransformPool,
+    ParticleSystem,
+    BodyManager,
+    Size,
     Vector2,
+    Singelton,
+    SingeltonEntity,
 )
+from pyengine.barplot import BarPlot
 
 
 class BaseTestWithCleanup(unittest.TestCase):
@@ -30,6 +65,21 @@ class BaseTestWithCleanup(unittest.TestCase):
         GameManager().update()
 
 
+class Box(Entity):
+    """
+    A sized entity, render is a Mock that fills its screen rect red
+    """
+
+    def __init__(self, pos, size, static=False):
+        super().__init__()
+        self.transform.pos = pos
+        self.transform.size = size
+        self.static = static
+        self.render = Mock(
+            side_effect=lambda sur: sur.fill((255, 0, 0), self.screen_rect())
+        )
+
+
 class TestEntityLifecycle(BaseTestWithCleanup):
     def setUp(self):
         pygame.init()
@@ -88,13 +138,25 @@ class TestUiButtonHover(unittest.TestCase):
     @patch("pygame.mouse.get_pos")
     def test_hover_inside_button(self, mock_mouse_pos):
         mock_mouse_pos.return_value = (10, 10)
+        InputManager().update()
         self.assertTrue(self.button.check_hover())
 
     @patch("pygame.mouse.get_pos")
     def test_hover_outside_button(self, mock_mouse_pos):
         mock_mouse_pos.return_value = (200, 200)
+        InputManager().update()
         self.assertFalse(self.button.check_hover())
 
+    def test_input_is_read_once_per_frame(self):
+        with patch("pygame.mouse.get_pos", return_value=(10, 10)) as get_pos:
+            InputManager().update()
+            for _ in range(3):
+                self.button.check_hover()
+            get_pos.assert_called_once()
+        self.assertEqual(InputManager().mouse_pos, (10, 10))
+        self.assertFalse(InputManager().is_down(pygame.K_a))
+        self.assertFalse(InputManager().is_mouse_down(pygame.BUTTON_LEFT))
+
 
 class TestAnimation(BaseTestWithCleanup):
     def test_linear_animation(self):
@@ -126,6 +188,103 @@ class TestInputManager(BaseTestWithCleanup):
         im.trigger_key_down(pygame.K_a)
         self.assertTrue(self.called)
 
+    def test_killed_entities_callbacks_are_released(self):
+        class Listener(Entity):
+            def __init__(self):
+                super().__init__()
+                InputManager().register_key_down(
+                    pygame.K_a, self, lambda: self.on_key()
+                )
+                InputManager().register_mouse_scroll(self, lambda _: self.on_key())
+
+            def on_key(self):
+                pass
+
+        im = InputManager()
+        im.clear()
+        listeners = GameManager().instatiate(*(Listener() for _ in range(100)))
+        GameManager().update()
+        self.assertEqual(len(im.callbacks_key_down[pygame.K_a]), 100)
+        refs = [weakref.ref(listener) for listener in listeners]
+        GameManager().destroy(*listeners)
+        GameManager().update()
+        del listeners
+        gc.collect()
+        self.assertNotIn(pygame.K_a, im.callbacks_key_down)
+        self.assertEqual(im.callbacks_mouse_scroll, [])
+        self.assertEqual(im.entity_callbacks, {})
+        self.assertTrue(all(ref() is None for ref in refs))
+
+    def test_callbacks_are_sorted_lazily_by_z_index(self):
+        im = InputManager()
+        im.clear()
+        order = []
+        entities = [Animation(1.0) for _ in range(3)]
+        for i, entity in enumerate(entities):
+            entity.z_index = i
+            im.register_key_down(pygame.K_a, entity, lambda i=i: order.append(i))
+        im.register_key_down(pygame.K_b, entities[1], lambda: None)
+        GameManager().instatiate(*entities)
+        GameManager().update()
+        im.trigger_key_down(pygame.K_a)
+        self.assertEqual(order, [2, 1, 0])
+
+        key_b = im.callbacks_key_down[pygame.K_b]
+        entities[0].z_index = 5
+        self.assertIn(id(im.callbacks_key_down[pygame.K_a]), im.unsorted_callbacks)
+        self.assertNotIn(id(key_b), im.unsorted_callbacks)
+        order.clear()
+        im.trigger_key_down(pygame.K_a)
+        self.assertEqual(order, [0, 2, 1])
+        self.assertEqual(im.unsorted_callbacks, {})
+
+    def test_registering_during_a_trigger_does_not_repeat_it(self):
+        im = InputManager()
+        im.clear()
+        calls = []
+        low, high = Animation(1.0), Animation(1.0)
+        high.z_index = 10
+
+        def on_key():
+            calls.append(low)
+            im.register_key_down(pygame.K_a, high, lambda: calls.append(high))
+
+        im.register_key_down(pygame.K_a, low, on_key)
+        GameManager().instatiate(low, high)
+        GameManager().update()
+        im.trigger_key_down(pygame.K_a)
+        self.assertEqual(calls, [low])
+        calls.clear()
+        im.trigger_key_down(pygame.K_a)
+        self.assertEqual(calls, [high, low])
+
+    def test_singelton_entity_keeps_its_callbacks_when_killed(self):
+        class Manager(SingeltonEntity):
+            def __init__(self):
+                super().__init__()
+                self.presses = 0
+                InputManager().register_key_down(pygame.K_a, self, self.on_key)
+
+            def on_key(self):
+                self.presses += 1
+
+        im = InputManager()
+        im.clear()
+        manager = Manager()
+        GameManager().update()
+        GameManager().destroy(manager)
+        GameManager().update()
+        self.assertIs(Manager(), manager)
+        self.assertIn(manager, GameManager().entities)
+        im.trigger_key_down(pygame.K_a)
+        self.assertEqual(manager.presses, 1)
+
+        # it would re-instantiate itself forever, take it out by hand
+        GameManager().entities.discard(manager)
+        Entity.kill(manager)
+        im.unregister(manager)
+        Singelton._instances.pop(Manager)
+
 
 class TestColliderManager(unittest.TestCase):
 
@@ -200,6 +359,670 @@ class TestRenderSorting(BaseTestWithCleanup):
         self.assertEqual(RenderManager().entityes_sorted, [self.a, self.b])
 
 
+class TestRenderCulling(unittest.TestCase):
+    def setUp(self):
+        self.on_screen = Box(Vector2(5, 5), Vector2(10, 10))
+        self.off_screen = Box(Vector2(500, 5), Vector2(10, 10))
+        self.no_size = Box(Vector2(500, 500), Vector2(0, 0))
+        self.entities = [self.on_screen, self.off_screen, self.no_size]
+        for entity in self.entities:
+            RenderManager().register(entity)
+
+    def tearDown(self):
+        for entity in self.entities:
+            RenderManager().unregister(entity)
+        RenderManager().cull = True
+        return super().tearDown()
+
+    def test_off_screen_entities_are_skipped(self):
+        RenderManager().render(pygame.Surface((100, 100)))
+        self.on_screen.render.assert_called_once()
+        self.no_size.render.assert_called_once()
+        self.off_screen.render.assert_not_called()
+        self.assertEqual(RenderManager().culled_count, 1)
+
+    def test_render_bounds_keep_entities_drawing_outside_their_rect(self):
+        class Line(Box):
+            def render_bounds(self):
+                return self.screen_rect().inflate(40, 0)
+
+        line = Line(Vector2(105, 5), Vector2(10, 10))
+        RenderManager().register(line)
+        RenderManager().render(pygame.Surface((100, 100)))
+        RenderManager().unregister(line)
+        line.render.assert_called_once()
+        self.off_screen.render.assert_not_called()
+        self.assertEqual(RenderManager().culled_count, 1)
+
+    def test_culling_can_be_disabled(self):
+        RenderManager().cull = False
+        RenderManager().render(pygame.Surface((100, 100)))
+        self.off_screen.render.assert_called_once()
+
+
+class TestCamera(unittest.TestCase):
+    def setUp(self):
+        self.camera = Camera(
+            Vector2(100, 100), zoom=2, viewport=pygame.Rect(0, 0, 100, 50)
+        )
+
+    def tearDown(self):
+        RenderManager().camera = None
+        return super().tearDown()
+
+    def test_world_screen_round_trip(self):
+        self.assertEqual(
+            self.camera.world_to_screen(Vector2(100, 100)), Vector2(50, 25)
+        )
+        self.assertEqual(
+            self.camera.world_to_screen(Vector2(110, 100)), Vector2(70, 25)
+        )
+        self.assertEqual(
+            self.camera.screen_to_world(Vector2(70, 25)), Vector2(110, 100)
+        )
+        self.assertEqual(self.camera.view_rect, pygame.Rect(75, 87, 50, 25))
+
+    def test_render_manager_culls_and_maps_through_camera(self):
+        RenderManager().camera = self.camera
+        seen = Entity()
+        seen.transform.pos = Vector2(95, 95)
+        seen.transform.size = Vector2(10, 10)
+        hidden = Entity()
+        hidden.transform.pos = Vector2(0, 0)
+        hidden.transform.size = Vector2(10, 10)
+        self.assertEqual(seen.screen_rect(), pygame.Rect(40, 15, 20, 20))
+        RenderManager().register(seen)
+        RenderManager().register(hidden)
+        try:
+            visible = RenderManager().visible_entities(
+                pygame.Rect(0, 0, 100, 50), self.camera.view_rect
+            )
+        finally:
+            RenderManager().unregister(seen)
+            RenderManager().unregister(hidden)
+        self.assertIn(seen, visible)
+        self.assertNotIn(hidden, visible)
+
+
+class TestDirtyRects(unittest.TestCase):
+    def setUp(self):
+        RenderManager().dirty_rects_mode = True
+        RenderManager().invalidate()
+        self.sur = pygame.Surface((100, 100))
+        self.left = Box(Vector2(5, 5), Vector2(10, 10))
+        self.right = Box(Vector2(80, 80), Vector2(10, 10))
+        for entity in (self.left, self.right):
+            RenderManager().register(entity)
+        RenderManager().render(self.sur)
+
+    def tearDown(self):
+        for entity in (self.left, self.right):
+            if entity in RenderManager().entityes_sorted:
+                RenderManager().unregister(entity)
+        RenderManager().dirty_rects_mode = False
+        RenderManager().invalidate()
+        return super().tearDown()
+
+    def reset_mocks(self):
+        self.left.render.reset_mock()
+        self.right.render.reset_mock()
+
+    def test_first_frame_is_a_full_redraw(self):
+        self.assertEqual(RenderManager().dirty_rects, [self.sur.get_rect()])
+        self.left.render.assert_called_once()
+        self.right.render.assert_called_once()
+
+    def test_unchanged_frame_draws_nothing(self):
+        self.reset_mocks()
+        RenderManager().render(self.sur)
+        self.assertEqual(RenderManager().dirty_rects, [])
+        self.left.render.assert_not_called()
+        self.right.render.assert_not_called()
+
+    def test_moved_entity_redraws_old_and_new_rect(self):
+        self.reset_mocks()
+        self.left.transform.pos.x += 5
+        RenderManager().render(self.sur)
+        (dirty,) = RenderManager().dirty_rects
+        self.assertTrue(dirty.contains(pygame.Rect(5, 5, 15, 10)))
+        self.left.render.assert_called_once()
+        self.right.render.assert_not_called()
+
+    def test_marked_and_removed_entities_are_redrawn(self):
+        self.reset_mocks()
+        self.right.mark_dirty()
+        RenderManager().unregister(self.left)
+        RenderManager().render(self.sur)
+        self.assertEqual(len(RenderManager().dirty_rects), 2)
+        self.assertTrue(
+            any(
+                rect.contains(pygame.Rect(5, 5, 10, 10))
+                for rect in RenderManager().dirty_rects
+            )
+        )
+        self.left.render.assert_not_called()
+        self.right.render.assert_called_once()
+
+    def test_dirty_regions_cover_render_bounds(self):
+        class Line(Box):
+            def render_bounds(self):
+                return self.screen_rect().inflate(20, 0)
+
+        line = Line(Vector2(40, 40), Vector2(10, 10))
+        RenderManager().register(line)
+        RenderManager().render(self.sur)
+        RenderManager().unregister(line)
+        (dirty,) = RenderManager().dirty_rects
+        self.assertTrue(dirty.contains(pygame.Rect(30, 40, 30, 10)))
+
+
+class TestStaticLayers(unittest.TestCase):
+    def setUp(self):
+        self.sur = pygame.Surface((100, 100))
+        self.static_box = Box(Vector2(5, 5), Vector2(10, 10), static=True)
+        self.dynamic_box = Box(Vector2(50, 50), Vector2(10, 10))
+        self.entities = [self.static_box, self.dynamic_box]
+        for entity in self.entities:
+            RenderManager().register(entity)
+
+    def tearDown(self):
+        for entity in self.entities:
+            RenderManager().unregister(entity)
+        RenderManager().static_z_indices.clear()
+        return super().tearDown()
+
+    def test_static_entity_renders_once(self):
+        for _ in range(3):
+            RenderManager().render(self.sur)
+        self.static_box.render.assert_called_once()
+        self.assertEqual(self.dynamic_box.render.call_count, 3)
+        self.assertEqual(self.sur.get_at((6, 6)), pygame.Color(255, 0, 0))
+
+    def test_layer_rerenders_when_invalidated(self):
+        RenderManager().render(self.sur)
+        self.static_box.mark_dirty()
+        RenderManager().render(self.sur)
+        self.static_box.transform.pos.x += 10
+        RenderManager().render(self.sur)
+        self.assertEqual(self.static_box.render.call_count, 3)
+
+    def test_whole_z_index_can_be_static(self):
+        RenderManager().set_static_layer(0)
+        for _ in range(3):
+            RenderManager().render(self.sur)
+        self.dynamic_box.render.assert_called_once()
+        RenderManager().unregister(self.dynamic_box)
+        self.entities.remove(self.dynamic_box)
+        RenderManager().render(self.sur)
+        self.assertEqual(self.static_box.render.call_count, 2)
+
+
+class TestTextCache(unittest.TestCase):
+    def setUp(self):
+        TextCache().clear()
+
+    def tearDown(self):
+        TextCache().clear()
+        TextCache.MAX_SIZE = 512
+        return super().tearDown()
+
+    def test_same_text_is_rendered_once(self):
+        font = CachedFont(size=20)
+        first = font.render("hello", True, pygame.Color("White"))
+        second = font.render("hello", True, (255, 255, 255, 255))
+        self.assertIs(first, second)
+        self.assertEqual((TextCache().hits, TextCache().misses), (1, 1))
+        font.render("hello", False, pygame.Color("White"))
+        self.assertEqual(TextCache().misses, 2)
+
+    def test_least_recently_used_is_evicted(self):
+        TextCache.MAX_SIZE = 2
+        font = CachedFont(size=20)
+        a = font.render("a", True, "White")
+        font.render("b", True, "White")
+        font.render("a", True, "White")
+        font.render("c", True, "White")
+        self.assertIs(font.render("a", True, "White"), a)
+        font.render("b", True, "White")
+        self.assertEqual(TextCache().misses, 4)
+
+    def test_threads_render_and_forget_under_the_lock(self):
+        font = CachedFont(size=20)
+        barrier = threading.Barrier(4)
+        results = []
+
+        def render():
+            barrier.wait()
+            results.append(font.render("shared", True, "White"))
+            TextCache().forget(font)
+
+        threads = [threading.Thread(target=render) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(results), 4)
+        self.assertEqual(TextCache().surfaces, {})
+
+
+class TestSpriteBatching(unittest.TestCase):
+    def setUp(self):
+        image = pygame.Surface((4, 4))
+        image.fill((0, 255, 0))
+        self.sprites = [Sprite(image, Vector2(x * 10, 0)) for x in range(3)]
+        self.box = Animation(1.0)
+        self.box.render = Mock()
+        self.entities = self.sprites + [self.box]
+        for entity in self.entities:
+            RenderManager().register(entity)
+
+    def tearDown(self):
+        for entity in self.entities:
+            RenderManager().unregister(entity)
+        return super().tearDown()
+
+    def test_sprites_are_drawn_in_one_batch(self):
+        sur = pygame.Surface((100, 100))
+        with patch.object(
+            RenderManager, "blit_batch", wraps=RenderManager.blit_batch
+        ) as blit_batch:
+            RenderManager().render(sur)
+        blit_batch.assert_called_once()
+        self.assertEqual(len(blit_batch.call_args.args[1]), 3)
+        self.box.render.assert_called_once()
+        for x in range(3):
+            self.assertEqual(sur.get_at((x * 10 + 1, 1)), pygame.Color(0, 255, 0))
+
+    def test_sprites_overriding_render_are_not_batched(self):
+        class Blinking(Sprite):
+            def render(self, sur):
+                pass
+
+        blinking = Blinking(pygame.Surface((4, 4)))
+        RenderManager().register(blinking)
+        self.entities.append(blinking)
+        self.assertNotIn(blinking, RenderManager().sprites)
+        self.assertIn(self.sprites[0], RenderManager().sprites)
+
+
+class TestRenderTarget(unittest.TestCase):
+    def setUp(self):
+        self.box = Box(Vector2(10, 10), Vector2(10, 10))
+        RenderManager().register(self.box)
+
+    def tearDown(self):
+        RenderManager().unregister(self.box)
+        GameManager().render_scale = 1.0
+        GameManager().render_size = None
+        GameManager().scale_mode = ScaleMode.Nearest
+        GameManager().render(pygame.Surface((1, 1)))
+        return super().tearDown()
+
+    def test_render_scale_draws_at_lower_resolution(self):
+        GameManager().render_scale = 0.5
+        sur = pygame.Surface((100, 100))
+        GameManager().render(sur)
+        self.assertEqual(GameManager().render_target.get_size(), (50, 50))
+        # entities keep display coordinates
+        self.assertEqual(sur.get_at((15, 15)), pygame.Color(255, 0, 0))
+        self.assertEqual(sur.get_at((25, 25)), pygame.Color(0, 0, 0))
+        self.assertEqual(GameManager().to_render_pos((30, 30)), Vector2(30, 30))
+
+    def test_render_scale_keeps_the_whole_view(self):
+        far_box = Box(Vector2(1000, 600), Vector2(100, 100))
+        RenderManager().register(far_box)
+        GameManager().render_scale = 0.5
+        sur = pygame.Surface((1280, 720))
+        GameManager().render(sur)
+        RenderManager().unregister(far_box)
+        self.assertEqual(RenderManager().culled_count, 0)
+        self.assertEqual(far_box.screen_rect(), pygame.Rect(500, 300, 50, 50))
+        self.assertEqual(sur.get_at((1050, 650)), pygame.Color(255, 0, 0))
+
+    def test_render_scale_keeps_barplots_in_place(self):
+        plot = BarPlot(Vector2(150, 150), Size(100, 100), [1.0])
+        GameManager().render_scale = 0.5
+        sur = pygame.Surface((400, 400))
+        RenderManager().register(plot)
+        GameManager().render(sur)
+        RenderManager().unregister(plot)
+        plot.kill()
+        self.assertEqual(plot.screen_rect(), pygame.Rect(75, 75, 50, 50))
+        # the bar spans the plot's height, 10 pixels from its left
+        self.assertEqual(sur.get_at((200, 240)), BarPlot.BAR_DEFAULT_COLOR)
+        self.assertEqual(sur.get_at((100, 240)), pygame.Color(0, 0, 0))
+
+    def test_integer_scale_is_centered(self):
+        GameManager().render_size = (40, 30)
+        GameManager().scale_mode = ScaleMode.Integer
+        sur = pygame.Surface((100, 100))
+        GameManager().render(sur)
+        self.assertEqual(GameManager().render_target_rect, pygame.Rect(10, 20, 80, 60))
+        self.assertEqual(sur.get_at((30, 40)), pygame.Color(255, 0, 0))
+        self.assertEqual(GameManager().to_render_pos((30, 40)), Vector2(10, 10))
+
+
+class TestAssetManager(unittest.TestCase):
+    def setUp(self):
+        pygame.display.set_mode((1, 1))
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "square.png")
+        image = pygame.Surface((4, 4), pygame.SRCALPHA)
+        image.fill((255, 0, 0, 128))
+        pygame.image.save(image, self.path)
+
+    def tearDown(self):
+        AssetManager().clear()
+        self.tmp.cleanup()
+        return super().tearDown()
+
+    def test_image_is_loaded_once_and_converted(self):
+        first = AssetManager().image(self.path)
+        second = AssetManager().image(self.path)
+        self.assertIs(first, second)
+        self.assertTrue(first.get_flags() & pygame.SRCALPHA)
+        self.assertEqual(
+            first.get_bitsize(), pygame.display.get_surface().get_bitsize()
+        )
+
+    def test_asset_is_dropped_with_the_last_reference(self):
+        image = AssetManager().image(self.path)
+        AssetManager().image(self.path)
+        AssetManager().release(image)
+        self.assertIs(AssetManager().image(self.path), image)
+        AssetManager().release(image)
+        AssetManager().release(image)
+        self.assertIsNot(AssetManager().image(self.path), image)
+
+    def test_fonts_are_shared_by_face_and_size(self):
+        font = AssetManager().font(None, 20)
+        self.assertIs(AssetManager().font(None, 20), font)
+        self.assertIsNot(AssetManager().font(None, 21), font)
+        self.assertIsInstance(font, CachedFont)
+
+    def test_barplot_reuses_fonts_when_ys_change(self):
+        plot = BarPlot(Vector2(), Size(100, 100), [1.0, 2.0])
+        font = plot.details_title_font
+        plot.ys = [3.0, 1.0]
+        self.assertIs(plot.details_title_font, font)
+        self.assertEqual(len(AssetManager().assets), 2)
+
+
+class TestIndependentLayers(unittest.TestCase):
+    class Panel(Entity):
+        def __init__(self, x, z_index, color):
+            super().__init__()
+            self.transform.pos = Vector2(x, 0)
+            self.transform.size = Vector2(10, 10)
+            self.z_index = z_index
+            self.color = color
+            self.thread_name = None
+
+        def render(self, sur):
+            self.thread_name = threading.current_thread().name
+            sur.fill(self.color, self.transform.rect())
+
+    def setUp(self):
+        self.left = self.Panel(0, 1, (255, 0, 0))
+        self.right = self.Panel(20, 2, (0, 255, 0))
+        # drawn over the left panel, in z order
+        self.top = self.Panel(5, 3, (0, 0, 255))
+        self.entities = [self.left, self.right, self.top]
+        for entity in self.entities:
+            RenderManager().register(entity)
+        RenderManager().set_independent_layer(1)
+        RenderManager().set_independent_layer(2)
+
+    def tearDown(self):
+        for entity in self.entities:
+            RenderManager().unregister(entity)
+        RenderManager().set_independent_layer(1, False)
+        RenderManager().set_independent_layer(2, False)
+        return super().tearDown()
+
+    def test_layers_render_on_workers_and_composite_in_order(self):
+        sur = pygame.Surface((100, 100))
+        RenderManager().render(sur)
+        self.assertTrue(self.left.thread_name.startswith("render"))
+        self.assertTrue(self.right.thread_name.startswith("render"))
+        self.assertEqual(self.top.thread_name, threading.current_thread().name)
+        self.assertEqual(sur.get_at((2, 2)), pygame.Color(255, 0, 0))
+        self.assertEqual(sur.get_at((7, 2)), pygame.Color(0, 0, 255))
+        self.assertEqual(sur.get_at((22, 2)), pygame.Color(0, 255, 0))
+
+
+@unittest.skipIf(np is None, "numpy is not installed")
+class TestHeadless(unittest.TestCase):
+    def setUp(self):
+        self.box = Box(Vector2(2, 3), Vector2(4, 4))
+        RenderManager().register(self.box)
+
+    def tearDown(self):
+        RenderManager().unregister(self.box)
+        GameManager().headless = False
+        GameManager().frame = None
+        return super().tearDown()
+
+    def test_capture_frame_views_the_offscreen_surface(self):
+        sur = GameManager().init_headless((20, 10))
+        GameManager().render(sur)
+        GameManager().present()
+        frame = GameManager().capture_frame()
+        self.assertEqual(frame.shape, (20, 10, 3))
+        self.assertEqual(tuple(frame[3, 4]), (255, 0, 0))
+        frame[0, 0] = (0, 255, 0)
+        self.assertEqual(sur.get_at((0, 0)), pygame.Color(0, 255, 0))
+        del frame
+        copied = GameManager().capture_frame(copy=True)
+        copied[0, 0] = (0, 0, 255)
+        self.assertEqual(sur.get_at((0, 0)), pygame.Color(0, 255, 0))
+
+
+class TestFrameRecorder(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.sur = pygame.Surface((4, 2))
+        self.sur.fill((255, 0, 0))
+
+    def tearDown(self):
+        GameManager().recorder = None
+        self.tmp.cleanup()
+        return super().tearDown()
+
+    def test_render_records_png_frames(self):
+        recorder = FrameRecorder(self.tmp.name)
+        recorder.start()
+        GameManager().recorder = recorder
+        GameManager().render(self.sur)
+        GameManager().render(self.sur)
+        recorder.stop()
+        self.assertEqual(recorder.written, 2)
+        frame = pygame.image.load(os.path.join(self.tmp.name, "frame_000001.png"))
+        self.assertEqual(frame.get_at((0, 0)), pygame.Color(255, 0, 0))
+
+    def test_raw_stream(self):
+        recorder = FrameRecorder(self.tmp.name, RecordFormat.Raw)
+        recorder.start()
+        for _ in range(3):
+            recorder.capture(self.sur)
+        recorder.stop()
+        with open(os.path.join(self.tmp.name, "frames_4x2.rgb"), "rb") as raw:
+            data = raw.read()
+        self.assertEqual(len(data), 3 * 4 * 2 * 3)
+        self.assertEqual(data[:3], bytes((255, 0, 0)))
+
+    def test_full_buffer_drops_frames(self):
+        # not started, nothing drains the buffer
+        for policy in (RecordPolicy.DropNewest, RecordPolicy.DropOldest):
+            recorder = FrameRecorder(self.tmp.name, capacity=2, policy=policy)
+            recorder.capture(self.sur)
+            recorder.capture(self.sur)
+            recorder.capture(self.sur)
+            self.assertEqual(recorder.dropped, 1)
+            self.assertEqual(recorder.frames.qsize(), 2)
+
+    def test_block_without_a_writer_drops_frames(self):
+        recorder = FrameRecorder(self.tmp.name, capacity=1, policy=RecordPolicy.Block)
+        recorder.stop()  # never started
+        recorder.capture(self.sur)
+        recorder.capture(self.sur)
+        self.assertEqual(recorder.dropped, 1)
+
+        # a writer that died on an error
+        recorder = FrameRecorder(self.tmp.name, capacity=1, policy=RecordPolicy.Block)
+        recorder.start()
+        with patch("pygame.image.save", side_effect=OSError), patch(
+            "threading.excepthook"
+        ):
+            recorder.capture(self.sur)
+            recorder._writer.join(1)
+        self.assertFalse(recorder.running)
+        # the failed frame left room for one more
+        recorder.capture(self.sur)
+        recorder.capture(self.sur)
+        recorder.stop()
+        self.assertEqual(recorder.written, 0)
+        self.assertEqual(recorder.dropped, 1)
+
+
+class TestInputRecording(BaseTestWithCleanup):
+    def setUp(self):
+        super().setUp()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "session.in")
+        InputManager().clear()
+
+    def tearDown(self):
+        InputManager().stop()
+        self.tmp.cleanup()
+        super().tearDown()
+
+    def run_frames(self, dts):
+        for dt in dts:
+            GameManager().dt = dt
+            if InputManager().update():
+                self.pressed.append("quit")
+
+    def test_replay_feeds_back_recorded_frames(self):
+        self.pressed = []
+        listener = GameManager().instatiate(Animation(1.0))
+        GameManager().update()
+        InputManager().register_key_down(
+            pygame.K_a, listener, lambda: self.pressed.append(GameManager().dt)
+        )
+        InputManager().register_mouse_pressed(
+            pygame.BUTTON_LEFT, listener, lambda: self.pressed.append("click")
+        )
+
+        InputManager().record(self.path, seed=7)
+        pygame.event.clear()
+        pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=pygame.K_a))
+        self.run_frames([0.01])
+        pygame.event.post(
+            pygame.event.Event(pygame.MOUSEBUTTONDOWN, button=1, pos=(3, 4))
+        )
+        self.run_frames([0.02])
+        InputManager().stop()
+        self.assertEqual(self.pressed, [0.01, "click"])
+
+        self.pressed.clear()
+        InputManager().replay(self.path)
+        self.assertEqual(InputManager().mode, InputMode.Replay)
+        # live input is ignored while replaying
+        pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=pygame.K_a))
+        self.run_frames([0.5, 0.5, 0.5])
+        self.assertEqual(len(self.pressed), 3)
+        self.assertEqual(self.pressed[0], 0.01)
+        self.assertEqual(self.pressed[1:], ["click", "quit"])
+        # the replayed state follows the events
+        self.assertTrue(InputManager().is_down(pygame.K_a))
+        self.assertTrue(InputManager().is_mouse_down(pygame.BUTTON_LEFT))
+        self.assertEqual(InputManager().mode, InputMode.Live)
+
+
+class TestRenderCommands(unittest.TestCase):
+    class Tile(Entity):
+        REPLAY_COMMANDS = True
+
+        def __init__(self, x, image):
+            super().__init__()
+            self.transform.pos = Vector2(x, 0)
+            self.transform.size = Vector2(4, 4)
+            self.image = image
+            self.record_count = 0
+
+        def record(self, commands):
+            self.record_count += 1
+            commands.blit(self.image, self.transform.pos)
+
+    def setUp(self):
+        image = pygame.Surface((4, 4))
+        image.fill((0, 255, 0))
+        self.tiles = [self.Tile(x * 10, image) for x in range(3)]
+        for tile in self.tiles:
+            RenderManager().register(tile)
+
+    def tearDown(self):
+        for tile in self.tiles:
+            RenderManager().unregister(tile)
+        return super().tearDown()
+
+    def test_commands_are_merged_and_replayed(self):
+        sur = pygame.Surface((100, 100))
+        with patch.object(
+            RenderManager, "blit_batch", wraps=RenderManager.blit_batch
+        ) as blit_batch:
+            RenderManager().render(sur)
+            RenderManager().render(sur)
+        self.assertEqual(blit_batch.call_count, 2)
+        self.assertEqual(len(blit_batch.call_args.args[1]), 3)
+        self.assertEqual([tile.record_count for tile in self.tiles], [1, 1, 1])
+        self.assertEqual(sur.get_at((21, 1)), pygame.Color(0, 255, 0))
+
+    def test_changed_entities_record_again(self):
+        sur = pygame.Surface((100, 100))
+        RenderManager().render(sur)
+        self.tiles[0].mark_dirty()
+        self.tiles[1].transform.pos.x += 1
+        RenderManager().render(sur)
+        self.assertEqual([tile.record_count for tile in self.tiles], [2, 2, 1])
+
+    def test_color_changes_show_without_moving(self):
+        class Swatch(Entity):
+            def __init__(self):
+                super().__init__()
+                self.transform.pos = Vector2(50, 50)
+                self.transform.size = Vector2(4, 4)
+                self.color = pygame.Color(255, 0, 0)
+
+            def record(self, commands):
+                commands.rect(self.color, self.screen_rect())
+
+        swatch = Swatch()
+        RenderManager().register(swatch)
+        sur = pygame.Surface((100, 100))
+        RenderManager().render(sur)
+        swatch.color = pygame.Color(0, 0, 255)
+        RenderManager().render(sur)
+        RenderManager().unregister(swatch)
+        self.assertEqual(sur.get_at((51, 51)), pygame.Color(0, 0, 255))
+
+    def test_render_executes_recorded_commands(self):
+        sur = pygame.Surface((100, 100))
+        self.tiles[0].render(sur)
+        self.assertEqual(sur.get_at((1, 1)), pygame.Color(0, 255, 0))
+        commands = RenderCommands()
+        commands.rect((0, 0, 255), pygame.Rect(0, 10, 4, 4))
+        commands.circle((255, 0, 0), Vector2(50, 50), 3)
+        commands.line((255, 255, 255), Vector2(0, 90), Vector2(10, 90))
+        RenderCommands.execute(sur, commands.commands)
+        self.assertEqual(sur.get_at((1, 11)), pygame.Color(0, 0, 255))
+        self.assertEqual(sur.get_at((50, 50)), pygame.Color(255, 0, 0))
+        self.assertEqual(sur.get_at((5, 90)), pygame.Color(255, 255, 255))
+        self.assertNotIn(self.tiles[0], RenderManager().sprites)
+        self.assertIn(self.tiles[0], RenderManager().recorders)
+
+
 class TestTransformParenting(unittest.TestCase):
     def test_child_follows_parent(self):
         parent = Entity()
@@ -211,6 +1034,293 @@ class TestTransformParenting(unittest.TestCase):
         child.update(0)
         self.assertEqual(child.transform.pos, initial + Vector2(10, 0))
 
+    def test_deep_hierarchy_follows_in_place_moves(self):
+        root = Entity()
+        middle = Entity()
+        leaf = Entity()
+        middle.transform.pos = Vector2(5, 5)
+        leaf.transform.pos = Vector2(7, 7)
+        middle.set_parent(root)
+        leaf.set_parent(middle)
+        self.assertEqual(leaf.transform.local_pos, Vector2(2, 2))
+        root.transform.pos.x += 10
+        self.assertEqual(middle.transform.pos, Vector2(15, 5))
+        self.assertEqual(leaf.transform.pos, Vector2(17, 7))
+        middle.transform.local_pos.y = 0
+        self.assertEqual(leaf.transform.pos, Vector2(17, 2))
+
+    def test_moving_parent_doesnt_touch_children(self):
+        root = Entity()
+        children = [Entity() for _ in range(10)]
+        for child in children:
+            child.set_parent(root)
+        root.transform.pos += Vector2(1, 1)
+        self.assertEqual(children[0].transform.pos, Vector2(1, 1))
+        # the others recalculate their world position when read
+        self.assertEqual(children[1].transform._link.seen_pos, Vector2(0, 0))
+        self.assertEqual(children[1].transform.pos, Vector2(1, 1))
+
+    def test_child_follows_in_place_edits_of_its_pos(self):
+        parent = Transform()
+        child = Transform()
+        child.set_parent(parent)
+        child.pos.x += 5
+        parent.pos.y += 2
+        self.assertEqual(child.pos, Vector2(5, 2))
+        self.assertEqual(child.local_pos, Vector2(5, 0))
+
+    def test_detach_keeps_world_position(self):
+        parent = Entity()
+        child = Entity()
+        child.set_parent(parent)
+        parent.transform.pos = Vector2(3, 4)
+        child.set_parent(None)
+        parent.transform.pos = Vector2(0, 0)
+        self.assertEqual(child.transform.pos, Vector2(3, 4))
+
+    def test_destroyed_children_are_detached(self):
+        root = GameManager().instatiate(Entity())
+        children = GameManager().instatiate(*(Entity() for _ in range(100)))
+        for child in children:
+            child.set_parent(root)
+        GameManager().update()
+        GameManager().destroy(*children)
+        GameManager().update()
+        GameManager().destroy(root)
+        GameManager().update()
+        self.assertEqual(root.transform.children, [])
+
+    def test_derived_vectors_are_plain(self):
+        transform = Transform()
+        transform.pos = Vector2(2, 3)
+        derived = [
+            transform.pos + Vector2(1, 1),
+            transform.pos.copy(),
+            transform.pos * 2,
+            copy.deepcopy(transform.pos),
+            pickle.loads(pickle.dumps(transform.size)),
+        ]
+        for vector in derived:
+            self.assertIn(type(vector), (Vector2, Size))
+        moved = copy.deepcopy(transform.pos + Vector2(1, 1))
+        self.assertEqual(moved, Vector2(3, 4))
+        moved.x += 1
+        self.assertEqual(transform.pos, Vector2(2, 3))
+
+
+class TestTransformRect(unittest.TestCase):
+    def test_rect_is_cached_until_mutation(self):
+        transform = Transform()
+        transform.size = Vector2(10, 10)
+        rect = transform.rect()
+        self.assertIs(transform.rect(), rect)
+        transform.pos.x += 5
+        self.assertEqual(transform.rect().topleft, (5, 0))
+        transform.size.y = 20
+        self.assertEqual(transform.rect().size, (10, 20))
+
+    def test_copies_follow_their_own_edits(self):
+        entity = Entity()
+        entity.transform.pos = Vector2(1, 2)
+        entity.transform.size = Size(3, 4)
+        entity.transform.rect()
+        for copied in (
+            copy.deepcopy(entity).transform,
+            copy.deepcopy(entity.transform),
+            pickle.loads(pickle.dumps(entity.transform)),
+        ):
+            copied.pos.x = 50
+            copied.size.w = 10
+            self.assertEqual(copied.rect(), pygame.Rect(50, 2, 10, 4))
+        self.assertEqual(entity.transform.rect(), pygame.Rect(1, 2, 3, 4))
+
+        parent = Transform()
+        child = Transform()
+        child.set_parent(parent)
+        child.rect()
+        copied = copy.deepcopy(child)
+        copied.parent.pos.x = 5
+        copied.local_pos.y = 7
+        self.assertEqual(copied.pos, Vector2(5, 7))
+        self.assertEqual(copied.local_pos, Vector2(0, 7))
+        self.assertIs(copied.parent.children[0], copied)
+        self.assertEqual(child.pos, Vector2(0, 0))
+
+    def test_child_rect_follows_parent(self):
+        parent = Transform()
+        child = Transform()
+        child.size = Vector2(1, 1)
+        child.set_parent(parent)
+        child.rect()
+        parent.pos = Vector2(3, 3)
+        self.assertEqual(child.rect().topleft, (3, 3))
+
+
+@unittest.skipIf(np is None, "requires numpy")
+class TestTransformPool(BaseTestWithCleanup):
+    class Mover(Entity):
+        def __init__(self, pos, vel):
+            super().__init__()
+            self.transform = PooledTransform()
+            self.transform.pos = pos
+            self.transform.vel = vel
+
+    def test_integrate_moves_all_pooled_transforms(self):
+        a, b = GameManager().instatiate(
+            self.Mover(Vector2(0, 0), Vector2(1, 0)),
+            self.Mover(Vector2(5, 5), Vector2(0, 2)),
+        )
+        GameManager().update()
+        child = Transform()
+        child.set_parent(b.transform)
+        TransformPool().integrate(0.5)
+        self.assertEqual(a.transform.pos, Vector2(0.5, 0))
+        self.assertEqual(b.transform.rect().topleft, (5, 6))
+        self.assertEqual(child.pos, Vector2(0, 1))
+
+    def test_copies_are_not_pooled(self):
+        mover = GameManager().instatiate(self.Mover(Vector2(1, 2), Vector2(1, 0)))
+        GameManager().update()
+        TransformPool().integrate(1)
+        copied = self.Mover(Vector2(), Vector2())
+        copied.transform = copy.deepcopy(mover.transform)
+        self.assertIsNone(copied.transform._pool)
+        self.assertEqual(copied.transform.pos, Vector2(2, 2))
+        copied.transform.pos.x = 7
+        copied.transform.vel.y = 3
+        GameManager().instatiate(copied)
+        GameManager().update()
+        TransformPool().integrate(1)
+        self.assertEqual(copied.transform.pos, Vector2(8, 5))
+        self.assertEqual(mover.transform.pos, Vector2(3, 2))
+
+    def test_remove_keeps_rows_packed(self):
+        a, b = GameManager().instatiate(
+            self.Mover(Vector2(0, 0), Vector2(1, 0)),
+            self.Mover(Vector2(5, 5), Vector2(0, 2)),
+        )
+        GameManager().update()
+        count = TransformPool().count
+        GameManager().destroy(a)
+        GameManager().update()
+        self.assertEqual(TransformPool().count, count - 1)
+        b.transform.pos.x = 7
+        TransformPool().integrate(1)
+        self.assertEqual(b.transform.pos, Vector2(7, 7))
+        self.assertEqual(a.transform.pos, Vector2(0, 0))
+
+
+class TestBody(BaseTestWithCleanup):
+    class Faller(Entity):
+        def __init__(self):
+            super().__init__()
+            self.transform.pos = Vector2(0, 0)
+            self.add_body(velocity=Vector2(2, 0), acceleration=Vector2(0, 4))
+
+    def tearDown(self):
+        BodyManager.GRAVITY = Vector2(0, 0)
+        return super().tearDown()
+
+    def test_body_is_integrated_in_fixed_update(self):
+        faller = GameManager().instatiate(self.Faller())
+        GameManager().update()
+        BodyManager.GRAVITY = Vector2(0, 6)
+        with patch.object(UpdateManager, "FIXED_DT", 0.5):
+            UpdateManager().fixed_update()
+        self.assertEqual(faller.body.velocity, Vector2(2, 5))
+        self.assertEqual(faller.transform.pos, Vector2(1, 2.5))
+
+    def test_python_body_without_pool(self):
+        parent = Entity()
+        faller = Entity()
+        faller.set_parent(parent)
+        faller.add_body(velocity=Vector2(1, 0), drag=1)
+        GameManager().instatiate(faller)
+        GameManager().update()
+        self.assertIn(faller.body, BodyManager().bodies)
+        BodyManager().integrate(1)
+        self.assertEqual(faller.transform.pos, Vector2(0.5, 0))
+        GameManager().destroy(faller)
+        GameManager().update()
+        self.assertNotIn(faller.body, BodyManager().bodies)
+
+
+@unittest.skipIf(np is None, "requires numpy")
+class TestParticleSystem(unittest.TestCase):
+    def test_emit_update_expire(self):
+        particles = ParticleSystem(Vector2(10, 10), gravity=Vector2(0, 10))
+        self.assertEqual(particles.emit(100, life=(1, 1)), 100)
+        particles.emit(50, life=(0.1, 0.1))
+        particles.update(0.5)
+        self.assertEqual(particles.count, 100)
+        self.assertTrue((particles.vel[:100, 1] != 0).all())
+        particles.update(0.6)
+        self.assertEqual(particles.count, 0)
+
+    def test_emit_respects_capacity(self):
+        particles = ParticleSystem(capacity=10)
+        self.assertEqual(particles.emit(25), 10)
+        self.assertEqual(particles.emit(1), 0)
+
+    def test_render_stamps_particles(self):
+        sur = pygame.Surface((20, 20))
+        particles = ParticleSystem(Vector2(5, 5), radius=1, fade=False)
+        particles.emit(1, speed=(0, 0), color=pygame.Color("Red"))
+        particles.render(sur)
+        self.assertEqual(sur.get_at((5, 5)), pygame.Color("Red"))
+        self.assertEqual(sur.get_at((5, 6)), pygame.Color("Red"))
+        self.assertEqual(sur.get_at((7, 7)), pygame.Color("Black"))
+
+    def test_render_maps_through_camera_and_clips_to_viewport(self):
+        camera = Camera(Vector2(100, 100), zoom=2, viewport=pygame.Rect(0, 0, 100, 50))
+        RenderManager().camera = camera
+        self.addCleanup(setattr, RenderManager(), "camera", None)
+        sur = pygame.Surface((100, 100))
+        sur.set_clip(camera.screen_rect)
+        particles = ParticleSystem(radius=0, fade=False)
+        for pos in (Vector2(110, 100), Vector2(100, 120)):
+            particles.transform.pos = pos
+            particles.emit(1, speed=(0, 0), color=pygame.Color("Red"))
+        particles.render(sur)
+        self.assertEqual(sur.get_at((70, 25)), pygame.Color("Red"))
+        # (100, 120) maps to (50, 65), below the viewport
+        self.assertEqual(sur.get_at((50, 65)), pygame.Color("Black"))
+        red = pygame.mask.from_threshold(sur, pygame.Color("Red"), (1, 1, 1, 255))
+        self.assertEqual(red.count(), 1)
+
+    def test_render_writes_alpha_on_layer_surfaces(self):
+        sur = pygame.Surface((20, 20), pygame.SRCALPHA)
+        particles = ParticleSystem(Vector2(5, 5), radius=0)
+        particles.emit(1, speed=(0, 0), life=(1, 1), color=pygame.Color("Red"))
+        particles.update(0.5)
+        particles.render(sur)
+        self.assertEqual(sur.get_at((5, 5)), pygame.Color(255, 0, 0, 127))
+        self.assertEqual(sur.get_at((6, 6)).a, 0)
+
+    def test_dirty_rects_follow_the_particles(self):
+        RenderManager().dirty_rects_mode = True
+        RenderManager().invalidate()
+        self.addCleanup(setattr, RenderManager(), "dirty_rects_mode", False)
+        self.addCleanup(RenderManager().invalidate)
+        sur = pygame.Surface((100, 100))
+        particles = ParticleSystem(Vector2(50, 50), radius=1, fade=False)
+        RenderManager().register(particles)
+        self.addCleanup(RenderManager().unregister, particles)
+        RenderManager().render(sur)
+        particles.emit(
+            1, speed=(10, 10), angle_deg=(0, 0), life=(2, 2), color=pygame.Color("Red")
+        )
+        particles.update(1)
+        self.assertEqual(particles.render_bounds(), pygame.Rect(59, 49, 3, 3))
+        RenderManager().render(sur)
+        self.assertTrue(
+            any(
+                rect.contains(pygame.Rect(59, 49, 3, 3))
+                for rect in RenderManager().dirty_rects
+            )
+        )
+        self.assertEqual(sur.get_at((60, 50)), pygame.Color("Red"))
+
 
 class TestCollisionGraph(unittest.TestCase):
     def test_graph_connect(self):
@@ -257,6 +1367,77 @@ class TestUiButtonClick(BaseTestWithCleanup):
 
         button.on_left_click.assert_called_once()
 
+    def test_click_goes_to_topmost_button_only(self):
+        InputManager().clear()
+        buttons = GameManager().instatiate(UiButton(), UiButton(), UiButton())
+        for i, button in enumerate(buttons):
+            button.transform.size = Vector2(100, 50)
+            button.transform.pos = Vector2(i * 40, 0)
+            button.z_index = UiButton.UI_DEFAULT_Z_INDEX + i
+            button.on_left_click = Mock()
+        GameManager().update()
+
+        InputManager().trigger_mouse_pressed(pygame.BUTTON_LEFT, (50, 10))
+        buttons[0].on_left_click.assert_not_called()
+        buttons[1].on_left_click.assert_called_once()
+        buttons[2].on_left_click.assert_not_called()
+
+        InputManager().trigger_mouse_pressed(pygame.BUTTON_LEFT, (10, 60))
+        self.assertEqual(sum(b.on_left_click.call_count for b in buttons), 1)
+
+        GameManager().destroy(buttons[1])
+        GameManager().update()
+        self.assertEqual(InputManager().target_at(Vector2(50, 10), 1), buttons[0])
+
+    def test_same_z_click_goes_to_the_button_drawn_on_top(self):
+        InputManager().clear()
+        a, b = GameManager().instatiate(UiButton(), UiButton())
+        for button in (a, b):
+            button.transform.size = Vector2(100, 50)
+            button.on_left_click = Mock()
+        b.transform.pos = Vector2(40, 0)
+        GameManager().update()
+        # same z_index, b renders after a
+        entities = RenderManager().entityes_sorted
+        self.assertGreater(entities.index(b), entities.index(a))
+        InputManager().trigger_mouse_pressed(pygame.BUTTON_LEFT, (50, 10))
+        a.on_left_click.assert_not_called()
+        b.on_left_click.assert_called_once()
+
+    def test_higher_callbacks_can_stop_a_click_before_the_button(self):
+        InputManager().clear()
+        button = GameManager().instatiate(UiButton())
+        button.transform.size = Vector2(100, 50)
+        button.on_left_click = Mock(return_value=None)
+        palette, below = GameManager().instatiate(Entity(), Entity())
+        palette.z_index = UiButton.UI_DEFAULT_Z_INDEX + 1
+        below.z_index = UiButton.UI_DEFAULT_Z_INDEX - 1
+        on_palette = Mock(return_value=False)
+        on_below = Mock()
+        InputManager().register_mouse_pressed(pygame.BUTTON_LEFT, palette, on_palette)
+        InputManager().register_mouse_pressed(pygame.BUTTON_LEFT, below, on_below)
+        GameManager().update()
+
+        InputManager().trigger_mouse_pressed(pygame.BUTTON_LEFT, (10, 10))
+        button.on_left_click.assert_called_once()
+        on_below.assert_called_once()
+
+        on_palette.return_value = True
+        InputManager().trigger_mouse_pressed(pygame.BUTTON_LEFT, (10, 10))
+        button.on_left_click.assert_called_once()
+        self.assertEqual(on_below.call_count, 1)
+
+    def test_click_follows_a_moved_button(self):
+        InputManager().clear()
+        button = GameManager().instatiate(UiButton())
+        button.transform.size = Vector2(100, 50)
+        GameManager().update()
+        self.assertIs(InputManager().target_at(Vector2(10, 10), 1), button)
+        button.transform.pos = Vector2(200, 0)
+        InputManager().update_target_grid()
+        self.assertIsNone(InputManager().target_at(Vector2(10, 10), 1))
+        self.assertIs(InputManager().target_at(Vector2(210, 10), 1), button)
+
 
 class TestAnimationTypes(unittest.TestCase):
     def setUp(self):
@@ -288,5 +1469,84 @@ class TestGameManagerIntegration(BaseTestWithCleanup):
         self.assertEqual(e.state, EntityState.Destroyed)
 
 
+class TestFrameBudgetManager(unittest.TestCase):
+    def setUp(self):
+        self.budget = FrameBudgetManager().clear()
+        self.applied = []
+        for priority in (1, 0):
+            self.budget.register(
+                DegradationHook(
+                    priority,
+                    lambda p=priority: self.applied.append(p),
+                    lambda p=priority: self.applied.remove(p),
+                )
+            )
+
+    def tearDown(self):
+        FrameBudgetManager().clear()
+        return super().tearDown()
+
+    def overrun(self, phase, frames):
+        for _ in range(frames):
+            self.budget.phase_times[phase] = 1_000_000_000
+            self.budget.end_frame(60)
+
+    def test_degrades_in_priority_order(self):
+        self.overrun("render", FrameBudgetManager.OVER_BUDGET_FRAMES)
+        self.assertEqual(self.applied, [0])
+        self.assertEqual(self.budget.over_budget_phase, "render")
+        self.overrun("update", FrameBudgetManager.OVER_BUDGET_FRAMES)
+        self.assertEqual(self.applied, [0, 1])
+        self.assertEqual(self.budget.over_budget_phase, "update")
+
+    def test_restores_after_recovery(self):
+        self.overrun("render", FrameBudgetManager.OVER_BUDGET_FRAMES)
+        for _ in range(FrameBudgetManager.RECOVERY_FRAMES):
+            self.budget.end_frame(60)
+        self.assertEqual(self.applied, [])
+        self.assertIsNone(self.budget.over_budget_phase)
+
+    def test_skip_optional_renders(self):
+        self.budget.clear().register_default_hooks()
+        self.overrun("render", FrameBudgetManager.OVER_BUDGET_FRAMES)
+        optional = Animation(1.0)
+        optional.optional_render = True
+        optional.render = Mock()
+        RenderManager().register(optional)
+        RenderManager().render(pygame.Surface((1, 1)))
+        RenderManager().unregister(optional)
+        optional.render.assert_not_called()
+
+    def test_fixed_update_collisions_count_in_the_next_frame(self):
+        thread = threading.Thread(target=UpdateManager().fixed_update)
+        thread.start()
+        thread.join()
+        self.assertEqual(self.budget.phase_times["collision"], 0)
+        self.budget.end_frame(60)
+        self.assertGreater(self.budget.last_phase_times["collision"], 0)
+        self.budget.end_frame(60)
+        self.assertEqual(self.budget.last_phase_times["collision"], 0)
+
+
+class TestSlottedEntity(unittest.TestCase):
+    def test_slotted_entity_has_no_dict(self):
+        class Particle(SlottedEntity):
+            __slots__ = ("velocity",)
+
+            def __init__(self):
+                super().__init__()
+                self.velocity = Vector2()
+
+        particle = Particle()
+        self.assertFalse(hasattr(particle, "__dict__"))
+        self.assertFalse(hasattr(particle.transform, "__dict__"))
+
+    def test_slotted_entity_requires_slots(self):
+        with self.assertRaises(TypeError):
+
+            class Loose(SlottedEntity):
+                pass
+
+
 if __name__ == "__main__":
     unittest.main()